@@ -0,0 +1,137 @@
+"""
+Admission control for engine-bound endpoints.
+Estimates how long new engine work would wait in the scheduler and turns
+requests away (HTTP 429 with Retry-After) once that wait would exceed the
+budget for their class. Optional work has a tighter budget than essential
+work, so under load the /analyze recommendation is shed before the AI reply.
+"""
+
+import contextlib
+import math
+import threading
+from typing import Dict, Optional
+
+# Admission states reported by status()
+STATE_NORMAL = 'normal'          # Everything admitted
+STATE_SHEDDING = 'shedding'      # Optional work rejected
+STATE_OVERLOADED = 'overloaded'  # Essential work rejected too
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is turned away; carries the suggested retry delay in seconds."""
+
+    def __init__(self, kind, retry_after, estimated_wait_ms):
+        super().__init__(f"Server busy: {kind} requests are being shed, retry in {retry_after}s")
+        self.kind = kind
+        self.retry_after = retry_after
+        self.estimated_wait_ms = estimated_wait_ms
+
+
+class WorkClass:
+    """A kind of request and what it costs the engines."""
+
+    def __init__(self, priority, searches, budget_ms, essential):
+        """
+        Args:
+            priority: Scheduler priority its searches run at
+            searches: Engine searches one request needs
+            budget_ms: Maximum acceptable queue wait before requests are rejected
+            essential: Whether the work is essential (only shed when overloaded)
+        """
+        self.priority = priority
+        self.searches = searches
+        self.budget_ms = budget_ms
+        self.essential = essential
+
+
+class AdmissionController:
+    """Tracks queued and in-flight engine work and admits or rejects requests."""
+
+    def __init__(self, scheduler, engine_count: Optional[int], classes: Dict[str, WorkClass]):
+        """
+        Args:
+            scheduler: EngineScheduler (queue depths and search service time)
+            engine_count: Number of engines serving the admitted work
+                          (None: the scheduler's current engines, which may be autoscaled)
+            classes: Request kind -> WorkClass
+        """
+        self.scheduler = scheduler
+        self.engine_count = engine_count
+        self.classes = classes
+        self._lock = threading.Lock()
+        self._in_flight = {kind: 0 for kind in classes}
+        self._counters = {kind: {'admitted': 0, 'rejected': 0} for kind in classes}
+
+    def estimated_wait_ms(self, kind) -> float:
+        """
+        Expected wait before a new request of this kind gets an engine.
+
+        Searches ahead of it are the queued ones of its own or a more urgent
+        class plus every search already running (background work included);
+        it starts once they leave an engine free.
+        """
+        priority = self.classes[kind].priority
+        queued = sum(depth for p, depth in self.scheduler.queue_depths().items() if p <= priority)
+        running = self.scheduler.running_counts()
+        running_ahead = sum(count for p, count in running.items() if p <= priority)
+        # In-flight requests still have searches to issue (those not running yet);
+        # count the larger of the two views
+        with self._lock:
+            outstanding = sum(self._in_flight[k] * c.searches for k, c in self.classes.items() if c.priority <= priority)
+        pending = max(queued, outstanding - running_ahead)
+        ahead = pending + sum(running.values())
+        engine_count = max(1, self.engine_count if self.engine_count is not None else len(self.scheduler.engines))
+        if ahead < engine_count:
+            return 0.0
+        return (ahead - engine_count + 1) * self.scheduler.service_time_ms() / engine_count
+
+    def check(self, kind):
+        """Raise AdmissionRejected if a request of this kind should be turned away."""
+        budget_ms = self.classes[kind].budget_ms
+        wait_ms = self.estimated_wait_ms(kind)
+        if wait_ms > budget_ms:
+            with self._lock:
+                self._counters[kind]['rejected'] += 1
+            retry_after = max(1, math.ceil((wait_ms - budget_ms) / 1000))
+            raise AdmissionRejected(kind, retry_after, wait_ms)
+
+    @contextlib.contextmanager
+    def admit(self, kind):
+        """Context manager around a request: checks admission and tracks it while in flight."""
+        self.check(kind)
+        with self._lock:
+            self._in_flight[kind] += 1
+            self._counters[kind]['admitted'] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight[kind] -= 1
+
+    def state(self) -> str:
+        shedding = False
+        for kind, work in self.classes.items():
+            if self.estimated_wait_ms(kind) > work.budget_ms:
+                if work.essential:
+                    return STATE_OVERLOADED
+                shedding = True
+        return STATE_SHEDDING if shedding else STATE_NORMAL
+
+    def status(self) -> Dict:
+        classes = {}
+        for kind, work in self.classes.items():
+            with self._lock:
+                in_flight = self._in_flight[kind]
+                counters = dict(self._counters[kind])
+            classes[kind] = {
+                'essential': work.essential,
+                'budget_ms': work.budget_ms,
+                'estimated_wait_ms': round(self.estimated_wait_ms(kind), 1),
+                'in_flight': in_flight,
+                **counters
+            }
+        return {
+            'state': self.state(),
+            'service_ms_avg': round(self.scheduler.service_time_ms(), 1),
+            'classes': classes
+        }
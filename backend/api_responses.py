@@ -0,0 +1,230 @@
+"""
+API response encoding.
+Typed response models for the game payloads (FastAPI serializes a declared
+response model straight to JSON bytes in pydantic-core instead of walking the
+dicts with jsonable_encoder), gzip/brotli compression of large responses, and a
+cache of pre-serialized, precompressed bodies for stored games that can no
+longer change.
+"""
+
+import collections
+import gzip
+import json
+import threading
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, ConfigDict
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+
+from static_build import accepted_encodings
+
+try:
+    import orjson
+except ImportError:  # Optional - the standard library encoder is the fallback
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # Optional - gzip is always available
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/')
+
+
+# ----- Response models -----
+
+class HistoryEntry(BaseModel):
+    move: str
+    fen: str  # Position before the move
+
+
+class HistoryResponse(BaseModel):
+    moves: List[HistoryEntry]
+    total_moves: int
+
+
+class MoveAnalysis(BaseModel):
+    material_change: int
+    positional_change: int
+    feedback: str
+    best_move: str
+    user_move: str
+    cpl: int
+    explanation_id: Optional[str] = None
+    reused: bool = False
+
+
+class MoveResponse(BaseModel):
+    fen: str
+    ai_move: Optional[str] = None
+    is_game_over: bool
+    result: Optional[str] = None
+    move_history: List[HistoryEntry]
+    node_id: int
+    analysis: MoveAnalysis
+
+
+class StoredGame(BaseModel):
+    """A stored game as posted by the client, plus review status and (once ready) analysis."""
+    model_config = ConfigDict(extra='allow')
+
+    moves: List[Dict[str, Any]] = []
+    result: Optional[str] = None
+    timestamp: Optional[str] = None
+    status: Optional[str] = None
+    analysis: Optional[Dict[str, Any]] = None
+
+
+def parse_stored_game(payload) -> Dict:
+    """
+    Check a posted game against StoredGame before it is stored, so every stored
+    game can be served as that model.
+
+    Returns:
+        dict: The payload itself (extra fields are kept)
+
+    Raises:
+        ValueError: If the payload doesn't fit the model (pydantic's ValidationError)
+    """
+    StoredGame.model_validate(payload)
+    return payload
+
+
+# ----- Encoding -----
+
+def encode_json(content) -> bytes:
+    """Compact JSON bytes (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress a dynamic response body (fast settings: it is done per request)."""
+    if encoding == 'br':
+        return brotli.compress(data, quality=4)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+def supported_encodings():
+    """Content encodings this server can produce, in order of preference."""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    accepted = accepted_encodings(accept_encoding)
+    for encoding in supported_encodings():
+        if encoding in accepted:
+            return encoding
+    return None
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing JSON and text responses of at least min_size bytes.
+    Responses that already carry a Content-Encoding (precompressed assets and
+    cached game bodies) and streamed responses are passed through unchanged.
+    """
+
+    def __init__(self, app, min_size: int = 1024):
+        self.app = app
+        self.min_size = min_size
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get('accept-encoding', ''))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+
+        async def send_compressed(message):
+            nonlocal start_message
+            if message['type'] == 'http.response.start':
+                start_message = message  # Held back until the body size is known
+                return
+            if start_message is None:
+                await send(message)
+                return
+            start, start_message = start_message, None
+            headers = MutableHeaders(raw=start['headers'])
+            body = message.get('body', b'')
+            if (message['type'] == 'http.response.body' and not message.get('more_body', False)
+                    and len(body) >= self.min_size and 'content-encoding' not in headers
+                    and headers.get('content-type', '').startswith(COMPRESSIBLE_TYPES)):
+                body = compress(body, encoding)
+                headers['Content-Encoding'] = encoding
+                headers['Content-Length'] = str(len(body))
+                headers.add_vary_header('Accept-Encoding')
+                message = {**message, 'body': body}
+            await send(start)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+
+class PreserializedCache:
+    """
+    Encoded (and compressed) bodies of objects that no longer change, such as
+    stored games whose review finished. An entry is reused only while the
+    object is the same one with the same status, so a game that is replaced or
+    changes status is encoded again.
+    """
+
+    def __init__(self, max_entries: int = 64, min_size: int = 1024):
+        """
+        Args:
+            max_entries: Entries kept; the least recently used are dropped
+            min_size: Bodies smaller than this are not compressed
+        """
+        self.max_entries = max_entries
+        self.min_size = min_size
+        self._entries: "collections.OrderedDict[str, Dict]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _entry(self, key, content) -> Dict:
+        status = content.get('status')
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry['content'] is content and entry['status'] == status:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        body = encode_json(content)
+        bodies = {None: body}
+        if len(body) >= self.min_size:
+            for encoding in supported_encodings():
+                bodies[encoding] = compress(body, encoding)
+        entry = {'content': content, 'status': status, 'bodies': bodies}
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def response(self, key, content: Dict, accept_encoding: str = '') -> Response:
+        """JSON response for content, encoded once and then served from the cache."""
+        bodies = self._entry(key, content)['bodies']
+        headers = {'Vary': 'Accept-Encoding'}
+        body = bodies[None]
+        accepted = accepted_encodings(accept_encoding)
+        for encoding in supported_encodings():
+            if encoding in bodies and encoding in accepted:
+                headers['Content-Encoding'] = encoding
+                body = bodies[encoding]
+                break
+        return Response(body, media_type='application/json', headers=headers)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
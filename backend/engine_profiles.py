@@ -0,0 +1,161 @@
+"""
+Engine pools partitioned by UCI option profile.
+Engines are grouped by their option set (full-strength reviewer, limited-strength
+opponents, ...), each group with its own scheduler, so a search never has to
+reconfigure an engine (which costs time and clears its hash table). Each
+profile is sized independently and scaled between a minimum and maximum
+engine count from its queue depth.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from engine_scheduler import EngineScheduler
+from single_flight import CoalescingEngine
+
+
+def strength_options(elo: Optional[int]) -> Dict:
+    """
+    UCI options for a playing strength (None = full strength).
+    An Elo outside the engine's UCI_Elo range is clamped to it when the options
+    are applied (see engine_supervisor.fit_options).
+    """
+    if elo is None:
+        return {}
+    return {"UCI_LimitStrength": True, "UCI_Elo": elo}
+
+
+class EngineProfile:
+    """A named UCI option set and how many engines may run with it."""
+
+    def __init__(self, name, options=None, min_engines=1, max_engines=1):
+        """
+        Args:
+            name: Profile name, e.g. "reviewer-full" or "opponent-1350"
+            options: UCI options set once when each engine starts
+            min_engines: Engines kept running even when idle
+            max_engines: Upper bound when scaling up under load
+        """
+        self.name = name
+        self.options = dict(options or {})
+        self.min_engines = max(1, min_engines)
+        self.max_engines = max(self.min_engines, max_engines)
+
+
+class ProfilePool:
+    """One scheduler (and coalescing front) per profile, plus an autoscaler thread."""
+
+    def __init__(self, profiles: List[EngineProfile], engine_factory: Callable,
+                 scale_interval: float = 1.0, idle_before_scale_down: float = 60.0):
+        """
+        Args:
+            profiles: Engine profiles; the first one is the default
+            engine_factory: Callable (name, options) -> started engine (e.g. EngineSupervisor)
+            scale_interval: Seconds between autoscaling checks
+            idle_before_scale_down: Seconds a profile's queue must stay empty before
+                                    an engine above its minimum is retired
+        """
+        self.profiles = {profile.name: profile for profile in profiles}
+        self.default = profiles[0].name
+        self.engine_factory = engine_factory
+        self.scale_interval = scale_interval
+        self.idle_before_scale_down = idle_before_scale_down
+        self.schedulers: Dict[str, EngineScheduler] = {}
+        self.engines: Dict[str, CoalescingEngine] = {}
+        self._serial: Dict[str, int] = {}
+        self._last_busy: Dict[str, float] = {}
+        self._scaling = {name: {'scaled_up': 0, 'scaled_down': 0} for name in self.profiles}
+        for profile in profiles:
+            self._serial[profile.name] = 0
+            scheduler = EngineScheduler([self._new_engine(profile) for _ in range(profile.min_engines)])
+            self.schedulers[profile.name] = scheduler
+            self.engines[profile.name] = CoalescingEngine(scheduler)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _new_engine(self, profile):
+        name = f"{profile.name}-{self._serial[profile.name]}"
+        self._serial[profile.name] += 1
+        return self.engine_factory(name, profile.options)
+
+    def engine(self, profile_name: Optional[str] = None) -> CoalescingEngine:
+        """Engine handle for a profile (raises KeyError for an unknown profile)."""
+        return self.engines[profile_name or self.default]
+
+    # ----- Lifecycle -----
+
+    def start(self):
+        for scheduler in self.schedulers.values():
+            scheduler.start()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._autoscale, name="engine-autoscaler", daemon=True)
+        self._thread.start()
+        return self
+
+    def quit(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for engine in self.engines.values():
+            engine.quit()
+
+    def restart(self):
+        for engine in self.engines.values():
+            engine.restart()
+
+    # ----- Autoscaling -----
+
+    def _autoscale(self):
+        while not self._stop.wait(self.scale_interval):
+            for name in self.profiles:
+                self.scale(name)
+
+    def scale(self, profile_name, now=None):
+        """
+        Add an engine when a profile's queue outgrows its engines, retire one after a quiet period.
+
+        Returns:
+            int: +1, -1 or 0 engines
+        """
+        profile = self.profiles[profile_name]
+        scheduler = self.schedulers[profile_name]
+        now = time.monotonic() if now is None else now
+        queued = sum(scheduler.queue_depths().values())
+        count = len(scheduler.engines)
+
+        if queued:
+            self._last_busy[profile_name] = now
+            if queued >= count and count < profile.max_engines:
+                # Started outside the scheduler lock; requests keep being served meanwhile
+                scheduler.add_engine(self._new_engine(profile))
+                self._scaling[profile_name]['scaled_up'] += 1
+                return 1
+            return 0
+
+        idle_since = self._last_busy.setdefault(profile_name, now)
+        if count > profile.min_engines and now - idle_since >= self.idle_before_scale_down:
+            if scheduler.retire_engine() is not None:
+                self._last_busy[profile_name] = now  # One engine per quiet period
+                self._scaling[profile_name]['scaled_down'] += 1
+                return -1
+        return 0
+
+    # ----- Reporting -----
+
+    def status(self) -> Dict:
+        return {
+            'default': self.default,
+            'profiles': {
+                name: {
+                    'options': profile.options,
+                    'min_engines': profile.min_engines,
+                    'max_engines': profile.max_engines,
+                    **self._scaling[name],
+                    **self.schedulers[name].status(),
+                    'coalescing': self.engines[name].coalescing_stats()
+                }
+                for name, profile in self.profiles.items()
+            }
+        }
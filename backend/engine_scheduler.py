@@ -0,0 +1,324 @@
+"""
+Engine work scheduler.
+All engine searches go through one priority-aware scheduler so a bulk job
+(game review, PGN import) can't starve live play. Work is split into priority
+classes with per-class concurrency limits, and long background searches are
+time-sliced into iterative-deepening steps so interactive work never waits
+behind a full background search.
+"""
+
+import collections
+import concurrent.futures
+import threading
+import time
+from typing import Dict, List, Optional
+
+import chess.engine
+
+from single_flight import depth_limit
+
+# Priority classes, most urgent first
+PRIORITY_INTERACTIVE = 0  # Move review and the AI reply in /move
+PRIORITY_ANALYSIS = 1     # On-demand /analyze
+PRIORITY_BACKGROUND = 2   # Stored-game review, imports, batch jobs
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: 'interactive',
+    PRIORITY_ANALYSIS: 'analysis',
+    PRIORITY_BACKGROUND: 'background',
+}
+
+
+class _Job:
+    """One queued engine command."""
+
+    def __init__(self, priority, method, board, limit, kwargs):
+        self.priority = priority
+        self.method = method
+        self.board = board.copy()
+        self.limit = limit
+        self.kwargs = kwargs
+        self.future = concurrent.futures.Future()
+        self.enqueued_at = time.monotonic()
+        self.slice_depth = None  # Depth of the next slice for time-sliced jobs
+        self.engine = None  # Engine that ran the first slice; later slices wait for it
+
+
+class EngineScheduler:
+    """
+    Priority scheduler over a set of engines (one dispatcher thread per engine).
+
+    Exposes analyse()/play() with an extra priority argument, so it can stand in
+    for a single engine. Background depth searches deeper than slice_depth are
+    run as successively deeper slices and re-queued between slices, which
+    bounds how long interactive work can wait for an engine. Every slice of a
+    job runs on the engine that ran its first one, whose hash table keeps the
+    work from earlier slices.
+    """
+
+    def __init__(self, engines: List, class_limits: Optional[Dict[int, int]] = None,
+                 slice_depth: int = 6, slice_step: int = 2, initial_service_ms: float = 50.0):
+        """
+        Args:
+            engines: Engine-like objects (e.g. EngineSupervisor), one search at a time each
+            class_limits: Maximum concurrent searches per priority class
+                          (default: background may use all but one engine; the
+                          defaults follow the engine count as engines are added)
+            slice_depth: Depth of the first slice of a time-sliced background search
+            slice_step: Depth added by each following slice
+            initial_service_ms: Assumed search duration until real searches have been timed
+        """
+        self.engines = list(engines)
+        self.class_limits = dict(class_limits or {})
+        self.slice_depth = slice_depth
+        self.slice_step = slice_step
+
+        self._cond = threading.Condition()
+        self._queues = {priority: collections.deque() for priority in PRIORITY_NAMES}
+        self._running = {priority: 0 for priority in PRIORITY_NAMES}
+        self._threads = []
+        self._retiring = []  # Engines whose dispatcher should exit after its current job
+        self._started = False
+        self._stopping = False
+        self._service_ms_avg = initial_service_ms
+        self._metrics = {
+            priority: {'completed': 0, 'failed': 0, 'slices': 0, 'wait_ms_avg': 0.0, 'wait_ms_max': 0.0,
+                       'service_ms_avg': 0.0}
+            for priority in PRIORITY_NAMES
+        }
+
+    # ----- Lifecycle -----
+
+    def start(self):
+        with self._cond:
+            self._stopping = False
+            self._started = True
+        for engine in self.engines:
+            self._start_dispatcher(engine)
+        return self
+
+    def _start_dispatcher(self, engine):
+        thread = threading.Thread(target=self._dispatch, args=(engine,),
+                                  name=f"engine-dispatch-{len(self._threads)}", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def add_engine(self, engine):
+        """Add an engine to a (possibly running) scheduler."""
+        with self._cond:
+            self.engines.append(engine)
+            started = self._started and not self._stopping
+        if started:
+            self._start_dispatcher(engine)
+
+    def retire_engine(self):
+        """
+        Remove the most recently added engine once its current search (if any) is done.
+
+        Returns:
+            The engine being retired, or None if only one engine is left
+        """
+        with self._cond:
+            active = [engine for engine in self.engines if engine not in self._retiring]
+            if len(active) <= 1:
+                return None
+            engine = active[-1]
+            self._retiring.append(engine)
+            self._cond.notify_all()
+        if not self._started:
+            self._remove(engine)
+        return engine
+
+    def _remove(self, engine):
+        with self._cond:
+            self.engines.remove(engine)
+            self._retiring.remove(engine)
+            for jobs in self._queues.values():
+                for job in jobs:
+                    if job.engine is engine:
+                        job.engine = None  # Any engine may continue it, starting with a cold hash
+            self._cond.notify_all()  # Class limits changed
+        engine.quit()
+
+    def quit(self):
+        """Fail queued work, wait for running searches, then quit every engine."""
+        with self._cond:
+            self._stopping = True
+            for jobs in self._queues.values():
+                while jobs:
+                    jobs.popleft().future.set_exception(
+                        chess.engine.EngineTerminatedError("engine scheduler stopped"))
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self._started = False
+        for engine in self.engines:
+            engine.quit()
+
+    def restart(self):
+        """Restart every engine (each one drains its in-flight search first)."""
+        for engine in self.engines:
+            engine.restart()
+
+    # ----- Engine API -----
+
+    def submit(self, method, board, limit, priority=PRIORITY_INTERACTIVE, **kwargs):
+        """Queue an engine command; returns a Future for its result."""
+        job = _Job(priority, method, board, limit, kwargs)
+        depth = depth_limit(limit) if limit is not None else None
+        if (priority == PRIORITY_BACKGROUND and method == 'analyse' and not kwargs
+                and depth is not None and depth > self.slice_depth):
+            job.slice_depth = self.slice_depth
+        with self._cond:
+            if self._stopping:
+                raise chess.engine.EngineTerminatedError("engine scheduler stopped")
+            self._queues[priority].append(job)
+            self._cond.notify()
+        return job.future
+
+    def analyse(self, board, limit, priority=PRIORITY_INTERACTIVE, **kwargs):
+        return self.submit('analyse', board, limit, priority, **kwargs).result()
+
+    def play(self, board, limit, priority=PRIORITY_INTERACTIVE, **kwargs):
+        return self.submit('play', board, limit, priority, **kwargs).result()
+
+    # ----- Dispatch -----
+
+    def class_limit(self, priority) -> int:
+        """Maximum concurrent searches for a priority class with the current engines."""
+        if priority in self.class_limits:
+            return self.class_limits[priority]
+        count = len(self.engines) - len(self._retiring)
+        return max(1, count - 1) if priority == PRIORITY_BACKGROUND else max(1, count)
+
+    def _next_job(self, engine):
+        """
+        Pop the most urgent job for engine whose class is under its limit,
+        skipping slices that belong to other engines. Condition must be held.
+        """
+        for priority in sorted(self._queues):
+            jobs = self._queues[priority]
+            if jobs and self._running[priority] < self.class_limit(priority):
+                for job in jobs:
+                    if job.engine is None or job.engine is engine:
+                        jobs.remove(job)
+                        return job
+        return None
+
+    def _wait_for_job(self, engine):
+        """Block until there is a job for this engine; None once stopping or retiring. Condition must be held."""
+        while not self._stopping and engine not in self._retiring:
+            job = self._next_job(engine)
+            if job is not None:
+                return job
+            self._cond.wait()
+        return None
+
+    def _dispatch(self, engine):
+        while True:
+            with self._cond:
+                job = self._wait_for_job(engine)
+                if job is not None:
+                    self._running[job.priority] += 1
+                    self._record_wait(job)
+                retiring = job is None and engine in self._retiring
+            if job is None:
+                if retiring:
+                    self._remove(engine)
+                return
+
+            requeue = False
+            started = time.monotonic()
+            try:
+                if job.slice_depth is not None:
+                    limit = chess.engine.Limit(depth=job.slice_depth)
+                    result = engine.analyse(job.board, limit)
+                    if job.slice_depth < job.limit.depth:
+                        job.slice_depth = min(job.limit.depth, job.slice_depth + self.slice_step)
+                        job.engine = engine
+                        requeue = True
+                    else:
+                        job.future.set_result(result)
+                else:
+                    job.future.set_result(getattr(engine, job.method)(job.board, job.limit, **job.kwargs))
+            except Exception as e:
+                job.future.set_exception(e)
+
+            service_ms = (time.monotonic() - started) * 1000
+            with self._cond:
+                self._running[job.priority] -= 1
+                metrics = self._metrics[job.priority]
+                metrics['service_ms_avg'] = 0.9 * metrics['service_ms_avg'] + 0.1 * service_ms
+                self._service_ms_avg = 0.9 * self._service_ms_avg + 0.1 * service_ms
+                if requeue:
+                    metrics['slices'] += 1
+                    job.enqueued_at = time.monotonic()
+                    # Front of its class: finish started work before new background jobs
+                    self._queues[job.priority].appendleft(job)
+                elif job.future.exception() is None:
+                    metrics['completed'] += 1
+                else:
+                    metrics['failed'] += 1
+                self._cond.notify_all()
+
+    def _record_wait(self, job):
+        wait_ms = (time.monotonic() - job.enqueued_at) * 1000
+        metrics = self._metrics[job.priority]
+        metrics['wait_ms_avg'] = 0.9 * metrics['wait_ms_avg'] + 0.1 * wait_ms
+        metrics['wait_ms_max'] = max(metrics['wait_ms_max'], wait_ms)
+
+    # ----- Reporting -----
+
+    def service_time_ms(self) -> float:
+        """Moving average duration of one search (or slice), across all classes."""
+        return self._service_ms_avg
+
+    def queue_depths(self) -> Dict[int, int]:
+        with self._cond:
+            return {priority: len(jobs) for priority, jobs in self._queues.items()}
+
+    def running_counts(self) -> Dict[int, int]:
+        """Searches (or slices) currently on an engine, per priority class."""
+        with self._cond:
+            return dict(self._running)
+
+    def status(self) -> Dict:
+        with self._cond:
+            classes = {
+                PRIORITY_NAMES[priority]: {
+                    'queued': len(self._queues[priority]),
+                    'running': self._running[priority],
+                    'limit': self.class_limit(priority),
+                    **{key: round(value, 1) if isinstance(value, float) else value
+                       for key, value in self._metrics[priority].items()}
+                }
+                for priority in PRIORITY_NAMES
+            }
+            engines = list(self.engines)
+        return {
+            'classes': classes,
+            'engines': [engine.status() for engine in engines]
+        }
+
+
+class PriorityEngine:
+    """
+    Engine handle that submits every search at a fixed priority.
+
+    Lets code written against a single engine (e.g. GameReviewQueue workers)
+    run through the scheduler. The scheduler owns the engines, so quit() is a no-op.
+    """
+
+    def __init__(self, engine, priority):
+        self.engine = engine
+        self.priority = priority
+
+    def analyse(self, board, limit, **kwargs):
+        return self.engine.analyse(board, limit, priority=self.priority, **kwargs)
+
+    def play(self, board, limit, **kwargs):
+        return self.engine.play(board, limit, priority=self.priority, **kwargs)
+
+    def quit(self):
+        pass
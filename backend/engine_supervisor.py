@@ -0,0 +1,293 @@
+"""
+Engine supervisor module.
+Wraps a single UCI engine process with hard per-search timeouts, a health-check
+watchdog and transparent restarts, so a crashed or hung Stockfish costs one
+failed search instead of every request until the server is restarted.
+"""
+
+import concurrent.futures
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import chess.engine
+
+# Supervisor states reported by status()
+STATE_STOPPED = 'stopped'
+STATE_READY = 'ready'
+STATE_BUSY = 'busy'
+STATE_RESTARTING = 'restarting'
+STATE_DEAD = 'dead'
+
+
+class EngineUnavailableError(chess.engine.EngineError):
+    """Raised when a search can't be run: the engine is dead, hung or the wait was too long."""
+
+
+def fit_options(options: Dict, declared) -> Dict:
+    """
+    Clamp numeric options to the range the engine declares.
+    Strength limits differ between engine builds (Stockfish's lowest UCI_Elo is
+    1320, older builds 1350), and configuring a value out of range fails.
+
+    Args:
+        options: UCI options to apply
+        declared: The engine's option declarations (engine.options)
+    """
+    fitted = {}
+    for name, value in options.items():
+        option = declared.get(name)
+        if option is not None and option.type == 'spin' and isinstance(value, int):
+            if option.min is not None:
+                value = max(option.min, value)
+            if option.max is not None:
+                value = min(option.max, value)
+        fitted[name] = value
+    return fitted
+
+
+class EngineSupervisor:
+    """
+    Drop-in replacement for a SimpleEngine (analyse/play/quit) that supervises the process.
+
+    Searches are serialised - a SimpleEngine cancels the running command when a
+    new one arrives - and each one runs under a hard wall-clock timeout. A
+    timed out, crashed or unresponsive engine is killed and replaced with a new
+    process configured with the same options.
+    """
+
+    def __init__(self, engine_factory: Callable, options: Optional[Dict] = None,
+                 search_timeout: float = 10.0, queue_timeout: Optional[float] = None,
+                 watchdog_interval: float = 5.0, ping_timeout: float = 2.0,
+                 restart_backoff: float = 1.0, name: str = 'engine'):
+        """
+        Args:
+            engine_factory: Callable returning a new engine (e.g. SimpleEngine.popen_uci)
+            options: UCI options applied to every (re)started process
+            search_timeout: Hard limit in seconds for a depth/node limited search
+                            (time limited searches get their own time plus this grace)
+            queue_timeout: Maximum seconds to wait for the engine to become free
+                           (defaults to search_timeout)
+            watchdog_interval: Seconds between health checks of an idle engine
+            ping_timeout: Seconds an idle engine has to answer a health check
+            restart_backoff: Minimum seconds between attempts to start a dead engine
+            name: Name used in status reports
+        """
+        self.engine_factory = engine_factory
+        self.options = dict(options or {})
+        self.search_timeout = search_timeout
+        self.queue_timeout = search_timeout if queue_timeout is None else queue_timeout
+        self.watchdog_interval = watchdog_interval
+        self.ping_timeout = ping_timeout
+        self.restart_backoff = restart_backoff
+        self.name = name
+
+        self._lock = threading.Lock()  # Held for the duration of each engine command
+        self._rejected_lock = threading.Lock()  # Rejections happen exactly when _lock is unavailable
+        self._engine = None
+        self._executor = None
+        self._state = STATE_STOPPED
+        self._busy_since = None
+        self._last_start_attempt = 0.0
+        self._stopping = threading.Event()
+        self._watchdog = None
+        # Updated with _lock held, except 'rejected' (see _rejected_lock)
+        self._counters = {'searches': 0, 'timeouts': 0, 'crashes': 0, 'restarts': 0,
+                          'start_failures': 0, 'rejected': 0}
+        self._last_error = None
+
+    # ----- Lifecycle -----
+
+    def start(self):
+        """Start the engine process and the watchdog thread."""
+        self._stopping.clear()
+        with self._lock:
+            try:
+                self._ensure_engine()
+            except EngineUnavailableError:
+                pass  # Reported as 'dead'; the watchdog keeps retrying
+        if self._watchdog is None and self.watchdog_interval:
+            self._watchdog = threading.Thread(target=self._watchdog_loop, name=f"{self.name}-watchdog", daemon=True)
+            self._watchdog.start()
+        return self
+
+    def quit(self, timeout: Optional[float] = None):
+        """Drain the in-flight search, then shut the engine down."""
+        self._stopping.set()
+        acquired = self._lock.acquire(timeout=self.search_timeout if timeout is None else timeout)
+        try:
+            self._discard_engine(graceful=acquired)
+            self._state = STATE_STOPPED
+        finally:
+            if acquired:
+                self._lock.release()
+
+    def restart(self, reason: str = 'requested'):
+        """Gracefully restart: waits for the in-flight search to finish first."""
+        with self._lock:
+            self._restart_locked(reason, graceful=True)
+
+    # ----- Engine API -----
+
+    def analyse(self, board, limit, **kwargs):
+        return self._call('analyse', board, limit, **kwargs)
+
+    def play(self, board, limit, **kwargs):
+        return self._call('play', board, limit, **kwargs)
+
+    def configure(self, options):
+        """Change UCI options; they are re-applied after every restart."""
+        with self._lock:
+            self.options.update(options)
+            if self._engine is not None:
+                self._run(lambda engine: engine.configure(fit_options(options, getattr(engine, 'options', {}))),
+                          self.search_timeout)
+
+    def _call(self, method, board, limit, **kwargs):
+        if not self._lock.acquire(timeout=self.queue_timeout):
+            with self._rejected_lock:
+                self._counters['rejected'] += 1
+            raise EngineUnavailableError(f"{self.name}: engine busy for more than {self.queue_timeout}s")
+        try:
+            self._ensure_engine()
+            timeout = self.search_timeout + (limit.time or 0) if limit is not None else self.search_timeout
+            board = board.copy()  # The engine reads the board from another thread
+            self._counters['searches'] += 1
+            return self._run(lambda engine: getattr(engine, method)(board, limit, **kwargs), timeout)
+        finally:
+            self._lock.release()
+
+    def _run(self, command, timeout):
+        """Run command(engine) under a hard timeout; restarts the engine on failure. Lock must be held."""
+        engine = self._engine
+        self._state = STATE_BUSY
+        self._busy_since = time.monotonic()
+        future = self._executor.submit(command, engine)
+        try:
+            result = future.result(timeout=timeout)
+            self._state = STATE_READY
+            return result
+        except concurrent.futures.TimeoutError:
+            self._counters['timeouts'] += 1
+            self._restart_locked(f"search exceeded {timeout:.1f}s", graceful=False)
+            raise EngineUnavailableError(f"{self.name}: search timed out after {timeout:.1f}s")
+        except chess.engine.EngineTerminatedError as e:
+            self._counters['crashes'] += 1
+            self._restart_locked(f"engine terminated: {e}", graceful=False)
+            raise EngineUnavailableError(f"{self.name}: engine crashed during search") from e
+        except Exception:
+            if self._state == STATE_BUSY:
+                self._state = STATE_READY
+            raise
+        finally:
+            self._busy_since = None
+
+    # ----- Process management (lock must be held) -----
+
+    def _is_alive(self):
+        engine = self._engine
+        if engine is None:
+            return False
+        returncode = getattr(engine, 'returncode', None)
+        return not (returncode is not None and returncode.done())
+
+    def _ensure_engine(self):
+        if self._is_alive():
+            return
+        if self._engine is not None:
+            self._counters['crashes'] += 1
+            self._discard_engine(graceful=False)
+        wait = self._last_start_attempt + self.restart_backoff - time.monotonic()
+        if self._state == STATE_DEAD and wait > 0:
+            raise EngineUnavailableError(f"{self.name}: engine is down, retrying in {wait:.1f}s")
+
+        self._last_start_attempt = time.monotonic()
+        try:
+            engine = self.engine_factory()
+            try:
+                if self.options:
+                    engine.configure(fit_options(self.options, getattr(engine, 'options', {})))
+            except Exception:
+                # Don't leave the new process (and its I/O thread) running on every retry
+                try:
+                    engine.close()
+                except Exception:
+                    pass
+                raise
+        except Exception as e:
+            self._counters['start_failures'] += 1
+            self._state = STATE_DEAD
+            self._last_error = f"start failed: {e}"
+            raise EngineUnavailableError(f"{self.name}: could not start engine: {e}") from e
+        self._engine = engine
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.name)
+        self._state = STATE_READY
+
+    def _restart_locked(self, reason, graceful):
+        self._last_error = reason
+        self._state = STATE_RESTARTING
+        self._counters['restarts'] += 1
+        self._discard_engine(graceful=graceful)
+        if not self._stopping.is_set():
+            try:
+                self._ensure_engine()
+            except EngineUnavailableError:
+                pass  # Reported as 'dead'; the next search retries after the backoff
+
+    def _discard_engine(self, graceful):
+        engine, executor = self._engine, self._executor
+        self._engine = self._executor = None
+        if engine is not None:
+            try:
+                if graceful:
+                    executor.submit(engine.quit).result(timeout=self.ping_timeout)
+                else:
+                    engine.close()
+            except Exception:
+                try:
+                    engine.close()
+                except Exception:
+                    pass
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    # ----- Watchdog -----
+
+    def _watchdog_loop(self):
+        while not self._stopping.wait(self.watchdog_interval):
+            # Only check an idle engine; busy ones are covered by the search timeout
+            if not self._lock.acquire(blocking=False):
+                continue
+            try:
+                if self._stopping.is_set():
+                    break
+                if self._engine is None or not self._is_alive():
+                    try:
+                        self._ensure_engine()
+                    except EngineUnavailableError:
+                        pass
+                    continue
+                try:
+                    self._run(lambda engine: engine.ping(), self.ping_timeout)
+                except EngineUnavailableError:
+                    pass  # Already restarted by _run
+                except Exception as e:
+                    self._restart_locked(f"health check failed: {e}", graceful=False)
+            finally:
+                self._lock.release()
+
+    # ----- Reporting -----
+
+    def status(self) -> Dict:
+        engine = self._engine
+        transport = getattr(engine, 'transport', None)
+        busy_since = self._busy_since
+        return {
+            'name': self.name,
+            'state': self._state,
+            'pid': transport.get_pid() if transport is not None else None,
+            'busy_seconds': round(time.monotonic() - busy_since, 3) if busy_since else 0.0,
+            'options': self.options,
+            'last_error': self._last_error,
+            **self._counters
+        }
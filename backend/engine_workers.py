@@ -0,0 +1,45 @@
+"""
+Engines for process-pool workers.
+Offline generators (self-play, puzzle mining) run one task per game on a
+ProcessPoolExecutor; each worker process starts its engines once, keyed by
+their UCI options, and keeps them for every later task.
+"""
+
+import multiprocessing.util
+from typing import Dict, Optional
+
+import chess.engine
+
+from engine_supervisor import fit_options
+
+# This worker's engines, keyed by their UCI options
+_worker_engines: Dict = {}
+_worker_engine_path: Optional[str] = None
+
+
+def init_worker_engines(engine_path):
+    """ProcessPoolExecutor initializer: engine executable for worker_engine()."""
+    global _worker_engine_path
+    _worker_engine_path = engine_path
+    # Engine I/O threads would keep the worker alive at pool shutdown, so quit the
+    # engines from a finalizer (multiprocessing runs those before joining threads)
+    multiprocessing.util.Finalize(None, _quit_worker_engines, exitpriority=10)
+
+def _quit_worker_engines():
+    for engine in _worker_engines.values():
+        try:
+            engine.quit()
+        except Exception:
+            pass  # Already dead
+    _worker_engines.clear()
+
+def worker_engine(options: Dict):
+    """Engine with the given options, started once per worker process and kept for later tasks."""
+    key = tuple(sorted(options.items()))
+    engine = _worker_engines.get(key)
+    if engine is None:
+        engine = chess.engine.SimpleEngine.popen_uci(_worker_engine_path)
+        if options:
+            engine.configure(fit_options(options, engine.options))
+        _worker_engines[key] = engine
+    return engine
@@ -0,0 +1,220 @@
+"""
+Move explanation service.
+Generates natural-language explanations of classified moves with a local LLM
+(llama-cpp-python, GGUF model) off the request path. Prompts from all games are
+queued for one worker that loads the model once and takes them in groups
+(duplicates within a group are generated once); outputs are cached by
+(position, move, classification) and fetched by polling.
+"""
+
+import collections
+import os
+import queue
+import threading
+import traceback
+from typing import Callable, Dict, List, Optional
+
+import chess
+import chess.polyglot
+
+from move_classification import generate_feedback_message
+
+STATUS_PENDING = 'pending'
+STATUS_READY = 'ready'
+STATUS_FAILED = 'failed'
+
+PROMPT_TEMPLATE = (
+    "You are a friendly chess coach. Position (FEN): {fen}\n"
+    "The player played {move}, which an engine classified as {classification} "
+    "(centipawn loss {cpl}). The engine's best move was {best_move}.\n"
+    "In one or two sentences, explain why the move deserves that classification.\n"
+    "Explanation:"
+)
+
+
+def explanation_key(fen, move_san, classification):
+    """Cache key / public id for an explanation: position hash, move and classification."""
+    board = chess.Board(fen)
+    move = board.parse_san(move_san)
+    return f"{chess.polyglot.zobrist_hash(board):016x}-{move.uci()}-{classification}"
+
+
+class LlamaGenerator:
+    """
+    Runs prompts through a GGUF model with llama-cpp-python; the model is loaded once.
+    Completions are generated one after another - llama.cpp's n_batch (prompt
+    tokens evaluated per step) is left at its default.
+    """
+
+    def __init__(self, model_path, threads=4, context_size=512, max_tokens=96):
+        from llama_cpp import Llama  # Optional dependency, only needed when a model is configured
+        self.llm = Llama(model_path=model_path, n_threads=threads, n_ctx=context_size, verbose=False)
+        self.max_tokens = max_tokens
+
+    def __call__(self, items: List[Dict]) -> List[str]:
+        outputs = []
+        for item in items:
+            prompt = PROMPT_TEMPLATE.format(**item)
+            completion = self.llm.create_completion(prompt, max_tokens=self.max_tokens,
+                                                    temperature=0.2, stop=["\n\n"])
+            outputs.append(completion["choices"][0]["text"].strip())
+        return outputs
+
+
+class TemplateGenerator:
+    """Stand-in generator without a model: returns the fixed feedback template."""
+
+    def __call__(self, items: List[Dict]) -> List[str]:
+        return [generate_feedback_message(item['classification'], item['cpl'], item['move'], item['best_move'])
+                for item in items]
+
+
+def make_generator_factory(model_path, threads=4, context_size=512):
+    """
+    Pick a generator for the configured model path.
+
+    Returns:
+        Callable or None: Factory for a LlamaGenerator if the model file exists,
+                          TemplateGenerator for the special path "stub",
+                          otherwise None (explanations disabled)
+    """
+    if model_path == "stub":
+        return TemplateGenerator
+    if model_path and os.path.exists(model_path):
+        return lambda: LlamaGenerator(model_path, threads, context_size)
+    return None
+
+
+class ExplanationService:
+    """Cached explanation generation on a background thread, taking queued requests in groups."""
+
+    def __init__(self, generator_factory: Callable, batch_size: int = 8, batch_wait: float = 0.05,
+                 cache_size: int = 4096, max_pending: int = 256):
+        """
+        Args:
+            generator_factory: Callable returning a generator (list of request dicts -> list of texts);
+                               called on the worker thread so the model loads off the request path
+            batch_size: Maximum queued requests taken per generator call
+            batch_wait: Seconds to wait for more requests once the first one arrives
+            cache_size: Number of explanations kept
+            max_pending: Maximum queued requests (further requests are dropped)
+        """
+        self.generator_factory = generator_factory
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.cache_size = cache_size
+        self._requests = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._entries: "collections.OrderedDict[str, Dict]" = collections.OrderedDict()
+        self._thread = None
+        self._counters = {'requested': 0, 'cache_hits': 0, 'generated': 0, 'batches': 0, 'dropped': 0}
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._worker, name="explanations", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        if self._thread is not None:
+            self._requests.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def request(self, fen, move_san, classification, best_move, cpl) -> Optional[str]:
+        """
+        Ask for an explanation of a classified move. Never blocks on the model.
+
+        Returns:
+            str: Explanation id to poll with get(), or None if the queue is full
+        """
+        key = explanation_key(fen, move_san, classification)
+        with self._lock:
+            self._counters['requested'] += 1
+            entry = self._entries.get(key)
+            if entry is not None and entry['status'] != STATUS_FAILED:
+                self._entries.move_to_end(key)
+                self._counters['cache_hits'] += 1
+                return key
+            item = {'fen': fen, 'move': move_san, 'classification': classification,
+                    'cpl': cpl, 'best_move': best_move}
+            self._entries[key] = {'status': STATUS_PENDING, 'text': None}
+            self._evict()
+        try:
+            self._requests.put_nowait((key, item))
+        except queue.Full:
+            with self._lock:
+                self._entries.pop(key, None)
+                self._counters['dropped'] += 1
+            return None
+        return key
+
+    def get(self, key) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            return dict(entry, id=key) if entry is not None else None
+
+    def snapshot(self, limit: int) -> List:
+        """The most recently used ready explanations, oldest first, for a warm restart."""
+        with self._lock:
+            ready = [[key, entry] for key, entry in self._entries.items() if entry['status'] == STATUS_READY]
+        return ready[-limit:] if limit else []
+
+    def restore(self, entries: List):
+        """Add snapshot entries as older than anything cached since startup."""
+        with self._lock:
+            current = list(self._entries.items())
+            self._entries.clear()
+            for key, entry in entries:
+                self._entries[key] = entry
+            for key, entry in current:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+            self._evict()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'cached': len(self._entries), 'pending': self._requests.qsize(), **self._counters}
+
+    def _evict(self):
+        while len(self._entries) > self.cache_size:
+            self._entries.popitem(last=False)
+
+    def _next_batch(self):
+        """Block for the first request, then gather more for up to batch_wait seconds."""
+        first = self._requests.get()
+        if first is None:
+            return None
+        batch = [first]
+        while len(batch) < self.batch_size:
+            try:
+                item = self._requests.get(timeout=self.batch_wait)
+            except queue.Empty:
+                break
+            if item is None:
+                self._requests.put(None)  # Stop after this batch
+                break
+            batch.append(item)
+        return batch
+
+    def _worker(self):
+        generator = None
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            # The same explanation may have been requested twice before it was generated
+            items = collections.OrderedDict(batch)
+            try:
+                if generator is None:
+                    generator = self.generator_factory()
+                texts = generator(list(items.values()))
+                results = {key: {'status': STATUS_READY, 'text': text} for key, text in zip(items, texts)}
+                self._counters['generated'] += len(texts)
+            except Exception as e:
+                traceback.print_exc()
+                results = {key: {'status': STATUS_FAILED, 'text': None, 'error': str(e)} for key in items}
+            with self._lock:
+                self._counters['batches'] += 1
+                for key, result in results.items():
+                    self._entries[key] = result
+                self._evict()
@@ -1,15 +1,35 @@
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import chess
 import chess.engine
 import os
-from starlette.responses import JSONResponse
+from typing import Optional
+from starlette.responses import JSONResponse, Response
 from move_classification import classify_move, generate_feedback_message
 from openings import check_book_move_for_user, reset_book_logic
+from opening_explorer import OpeningExplorer
+from variation_tree import VariationTree, PLAYED_BY_ENGINE, PLAYED_BY_USER
+from warm_restart import WarmRestart
+from api_responses import (CompressionMiddleware, HistoryResponse, MoveResponse, PreserializedCache, StoredGame,
+                           encode_json, parse_stored_game)
+from admission import AdmissionController, AdmissionRejected, WorkClass
+from engine_profiles import EngineProfile, ProfilePool, strength_options
+from engine_scheduler import PriorityEngine, PRIORITY_INTERACTIVE, PRIORITY_ANALYSIS, PRIORITY_BACKGROUND
+from engine_supervisor import EngineSupervisor
+from explanations import ExplanationService, make_generator_factory
+from game_review import GameReviewQueue, STATUS_ANALYZING, STATUS_FAILED, STATUS_QUEUED, STATUS_READY
+from static_build import StaticBuild
+from tactical_prescreen import prescreen_move, prescreen_summary
+from game_stats import GameStatsStore
+from position_index import PositionIndex
+from profiling import Profiler, TracedEngine, profiled, span
 
 app = FastAPI()
 
+# Release mode: serve the prebuilt React app from this server instead of `npm start`
+RELEASE = os.environ.get("CHESSMENTOR_RELEASE", "").lower() in ("1", "true", "yes")
+
 # Allow CORS for local frontend
 app.add_middleware(
     CORSMiddleware,
@@ -19,18 +39,181 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-STOCKFISH_PATH = os.path.join("..", "stockfish", "stockfish")
+# JSON and text responses of at least this many bytes are sent gzip/brotli compressed
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+app.add_middleware(CompressionMiddleware, min_size=COMPRESSION_MIN_SIZE)
+
+STOCKFISH_PATH = os.environ.get("STOCKFISH_PATH", os.path.join("..", "stockfish", "stockfish"))
+
+# UCI options applied to every engine process (re-applied after restarts)
+ENGINE_OPTIONS = {
+    "Threads": int(os.environ.get("ENGINE_THREADS", "1")),
+    "Hash": int(os.environ.get("ENGINE_HASH", "16")),
+}
+ENGINE_SEARCH_TIMEOUT = float(os.environ.get("ENGINE_SEARCH_TIMEOUT", "10"))
+
+def open_engine():
+    """Start a new Stockfish process"""
+    return chess.engine.SimpleEngine.popen_uci(STOCKFISH_PATH)
+
+def supervised_engine(name, options=None):
+    """Start a Stockfish process under a supervisor (timeouts, watchdog, restarts)"""
+    return EngineSupervisor(open_engine, options={**ENGINE_OPTIONS, **(options or {})},
+                            search_timeout=ENGINE_SEARCH_TIMEOUT, name=name).start()
 
 # Global state (for MVP, not for production)
 board = chess.Board()
-engine = chess.engine.SimpleEngine.popen_uci(STOCKFISH_PATH)
+# Engines are grouped by UCI option profile so no search pays for reconfiguring
+# an engine: the full-strength reviewer analyzes moves, /analyze and stored
+# games, and each game picks the profile its opponent plays with. Within a
+# profile, work is scheduled by priority (/move, then /analyze, then background
+# review) and identical concurrent searches share one engine call.
+ENGINE_POOL_SIZE = int(os.environ.get("ENGINE_POOL_SIZE", "2"))
+ENGINE_POOL_MAX = int(os.environ.get("ENGINE_POOL_MAX", str(ENGINE_POOL_SIZE * 2)))
+OPPONENT_POOL_SIZE = int(os.environ.get("OPPONENT_POOL_SIZE", "1"))
+OPPONENT_POOL_MAX = int(os.environ.get("OPPONENT_POOL_MAX", "2"))
+REVIEWER_PROFILE = "reviewer-full"
+engine_profiles = ProfilePool([
+    EngineProfile(REVIEWER_PROFILE, min_engines=ENGINE_POOL_SIZE, max_engines=ENGINE_POOL_MAX),
+    EngineProfile("opponent-1350", strength_options(1350), OPPONENT_POOL_SIZE, OPPONENT_POOL_MAX),
+    EngineProfile("opponent-1800", strength_options(1800), OPPONENT_POOL_SIZE, OPPONENT_POOL_MAX),
+], supervised_engine, idle_before_scale_down=float(os.environ.get("ENGINE_SCALE_DOWN_IDLE", "60")))
+scheduler = engine_profiles.schedulers[REVIEWER_PROFILE]
+# Engine calls show up as spans in request profiles
+traced_engines = {name: TracedEngine(engine_profiles.engine(name), name) for name in engine_profiles.profiles}
+engine = traced_engines[REVIEWER_PROFILE]
+opponent_profile = REVIEWER_PROFILE  # Per game, chosen on /reset
+
+# Reject engine-bound requests (429 + Retry-After) once their queue wait would
+# exceed the budget; the optional /analyze recommendation is shed first
+admission = AdmissionController(scheduler, None, {
+    "move": WorkClass(PRIORITY_INTERACTIVE, searches=5, essential=True,
+                      budget_ms=float(os.environ.get("ADMISSION_MOVE_BUDGET_MS", "3000"))),
+    "analyze": WorkClass(PRIORITY_ANALYSIS, searches=2, essential=False,
+                         budget_ms=float(os.environ.get("ADMISSION_ANALYZE_BUDGET_MS", "500"))),
+})
+
+def admit(kind):
+    """Dependency that holds an admission slot for the duration of the request"""
+    def dependency():
+        with admission.admit(kind):
+            yield
+    return dependency
+
+# Every line explored in the current game; board, move_history and
+# full_san_sequence always describe the path to the tree's current node
+tree = VariationTree()
 move_history = []  # Track moves for history
 full_san_sequence = []  # Track both sides' SAN moves for book streak
 
+def sync_from_tree():
+    """Point the game state at the tree's current node (after a move, takeback or jump)"""
+    global board, move_history, full_san_sequence
+    board = tree.board()
+    move_history = tree.history()
+    full_san_sequence = tree.san_line()
+    # The book streak depends on the line played, so replay it for this path
+    reset_book_logic()
+    sequence = []
+    for node in tree.path():
+        if node.played_by == PLAYED_BY_USER:
+            check_book_move_for_user(sequence, node.san)
+        sequence.append(node.san)
+
 # Simple game storage for review (max 10 games)
 from collections import OrderedDict
 stored_games = OrderedDict()
 MAX_STORED_GAMES = 10
+# Reviewed games never change again, so their JSON is encoded and compressed once
+game_bodies = PreserializedCache(max_entries=MAX_STORED_GAMES, min_size=COMPRESSION_MIN_SIZE)
+
+# Background review of stored games (lowest scheduling priority)
+review_queue = GameReviewQueue(
+    lambda: PriorityEngine(engine, PRIORITY_BACKGROUND),
+    workers=int(os.environ.get("REVIEW_WORKERS", "1")),
+    max_pending=int(os.environ.get("REVIEW_QUEUE_SIZE", "16")),
+    limit=chess.engine.Limit(depth=int(os.environ.get("REVIEW_DEPTH", "10")))
+)
+
+# Aggregate statistics over every reviewed game, persisted as Parquet
+ANALYSIS_DIR = os.environ.get("ANALYSIS_DIR", "analysis")
+game_stats = GameStatsStore(os.path.join(ANALYSIS_DIR, "game_stats"))
+review_queue.add_listener(game_stats.add_game)
+
+# Zobrist / material signature / ECO -> (game_id, ply) postings
+position_index = PositionIndex(os.path.join(ANALYSIS_DIR, "position_index"))
+
+# Per-position move statistics (games, results, average CPL) plus book moves
+explorer = OpeningExplorer(os.path.join(ANALYSIS_DIR, "explorer.parquet"),
+                           max_ply=int(os.environ.get("EXPLORER_MAX_PLY", "30")))
+review_queue.add_listener(explorer.add_game)
+
+# On-demand profiling: admins send X-Profile: 1 (or ?profile=1) with X-Admin-Token,
+# and PROFILE_SAMPLE_RATE profiles a fraction of all requests
+profiler = Profiler(admin_token=os.environ.get("PROFILE_ADMIN_TOKEN") or None,
+                    sample_rate=float(os.environ.get("PROFILE_SAMPLE_RATE", "0")),
+                    max_reports=int(os.environ.get("PROFILE_MAX_REPORTS", "50")))
+
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    requested = request.headers.get("x-profile") == "1" or request.query_params.get("profile") == "1"
+    reason = profiler.should_profile(requested, request.headers.get("x-admin-token"))
+    if reason is None:
+        return await call_next(request)
+    with profiler.request(request.method, request.url.path, reason) as profile:
+        response = await call_next(request)
+    response.headers["X-Profile-Id"] = profile.id
+    return response
+
+@app.exception_handler(AdmissionRejected)
+def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    return JSONResponse(status_code=429,
+                        content={"error": str(exc), "retry_after": exc.retry_after},
+                        headers={"Retry-After": str(exc.retry_after)})
+
+# Optional local-LLM move explanations, generated off the request path
+LLM_BATCH_SIZE = int(os.environ.get("LLM_BATCH_SIZE", "8"))  # Queued requests per generator call
+_explanation_generator = make_generator_factory(
+    os.environ.get("LLM_MODEL_PATH"),
+    threads=int(os.environ.get("LLM_THREADS", "4")),
+    context_size=int(os.environ.get("LLM_CONTEXT_SIZE", "512"))
+)
+explanations = ExplanationService(_explanation_generator, batch_size=LLM_BATCH_SIZE) if _explanation_generator else None
+
+# Warm restart: the session, stored games and hot explanations are snapshotted on
+# shutdown and restored lazily, when a request first needs them
+WARM_CACHE_ENTRIES = int(os.environ.get("WARM_CACHE_ENTRIES", "1024"))
+warm_restart = WarmRestart(os.path.join(ANALYSIS_DIR, "snapshot"))
+
+def restore_session(snapshot):
+    global tree, opponent_profile
+    tree = VariationTree.from_dict(snapshot['tree'])
+    if snapshot['opponent'] in engine_profiles.profiles:
+        opponent_profile = snapshot['opponent']
+    sync_from_tree()
+
+def restore_stored_games(snapshot):
+    # Games stored since startup stay the newest ones
+    newer = list(stored_games.items())
+    stored_games.clear()
+    for game_id, game_data in snapshot + newer:
+        stored_games[game_id] = game_data
+    while len(stored_games) > MAX_STORED_GAMES:
+        stored_games.popitem(last=False)
+    for game_id, game_data in snapshot:
+        if game_id in stored_games and game_data.get('status') in (STATUS_QUEUED, STATUS_ANALYZING):
+            review_queue.submit(game_id, game_data)  # Review was cut short by the shutdown
+
+warm_restart.register("session", lambda: {'tree': tree.to_dict(), 'opponent': opponent_profile}, restore_session)
+warm_restart.register("stored_games", lambda: [[game_id, game_data] for game_id, game_data in stored_games.items()],
+                      restore_stored_games)
+if explanations is not None:
+    warm_restart.register("explanations", lambda: explanations.snapshot(WARM_CACHE_ENTRIES), explanations.restore)
+    restore_explanations = warm_restart.dependency("explanations")
+else:
+    restore_explanations = lambda: None
+session = Depends(warm_restart.dependency("session"))
+games = Depends(warm_restart.dependency("stored_games"))
 
 class MoveRequest(BaseModel):
     move: dict
@@ -38,55 +221,69 @@ class MoveRequest(BaseModel):
 class FenRequest(BaseModel):
     fen: str
 
-@app.get("/state")
+class ResetRequest(BaseModel):
+    opponent: Optional[str] = None  # Engine profile the opponent plays with
+
+class TakebackRequest(BaseModel):
+    plies: Optional[int] = None  # Default: back to before the last user move
+
+class GotoRequest(BaseModel):
+    node_id: int
+
+@app.get("/state", dependencies=[session])
 def get_state():
     return {
         'fen': board.fen(),
         'is_game_over': board.is_game_over(),
-        'result': board.result() if board.is_game_over() else None
+        'result': board.result() if board.is_game_over() else None,
+        'opponent': opponent_profile
     }
 
-@app.get("/history")
+@app.get("/history", dependencies=[session], response_model=HistoryResponse)
 def get_history():
     return {
         'moves': move_history,
         'total_moves': len(move_history)
     }
 
-@app.get("/analyze")
+@app.get("/analyze", dependencies=[session])
 def analyze_position():
     """Analyze current position and return evaluation"""
     try:
-        info = engine.analyse(board, chess.engine.Limit(depth=5))
-        score = info["score"].relative.score(mate_score=10000)
-        
-        # Get best move
-        best_move = engine.play(board, chess.engine.Limit(depth=5)).move
-        best_move_san = board.san(best_move)
+        # Positions already analyzed in this game's tree are answered from the node;
+        # only a search needs admission
+        node = tree.current
+        if node.evaluation is None:
+            with admission.admit("analyze"):
+                info = engine.analyse(board, chess.engine.Limit(depth=5), priority=PRIORITY_ANALYSIS)
+                score = info["score"].relative.score(mate_score=10000)
+                
+                # Get best move
+                best_move = engine.play(board, chess.engine.Limit(depth=5), priority=PRIORITY_ANALYSIS).move
+            best_move_san = board.san(best_move)
+            node.evaluation = {'evaluation': score, 'best_move': best_move_san}
         
         return {
-            'evaluation': score,
-            'best_move': best_move_san,
+            **node.evaluation,
             'fen': board.fen()
         }
+    except AdmissionRejected:
+        raise  # Answered with 429 by admission_rejected_handler
     except Exception as e:
         return JSONResponse(status_code=400, content={"error": str(e)})
 
-@app.put("/state")
+@app.put("/state", dependencies=[session])
 def set_state(req: FenRequest):
-    global board, move_history
+    global tree
     try:
-        board = chess.Board(req.fen)
-        # Rebuild move history from the new FEN
-        move_history = []
-        temp_board = chess.Board()
-        for move in board.move_stack:
-            move_history.append(temp_board.san(move))
-            temp_board.push(move)
+        # A FEN has no move stack: the position becomes the root of a new tree
+        tree = VariationTree(req.fen)
+        sync_from_tree()
         return {"fen": board.fen()}
     except Exception as e:
         return JSONResponse(status_code=400, content={"error": str(e)})
 
+@profiled
 def analyze_move_quality(board_before, move, engine, full_sequence):
     """Analyze the quality of a move considering material and position"""
     # Get material count before move
@@ -98,7 +295,8 @@ def analyze_move_quality(board_before, move, engine, full_sequence):
     move_san = board_before.san(move)
     
     # Check if this USER move is a book move
-    is_book, opening_info = check_book_move_for_user(full_sequence, move_san)
+    with span("book_lookup"):
+        is_book, opening_info = check_book_move_for_user(full_sequence, move_san)
     
     # Get material count after move
     material_after = get_material_count(board_after)
@@ -106,6 +304,24 @@ def analyze_move_quality(board_before, move, engine, full_sequence):
     # Calculate material change (positive = gain, negative = loss)
     material_change = material_after - material_before
     
+    # Obvious moves (only legal move, forced recapture, hanging queen) are
+    # decided statically - only ambiguous moves need the engine searches below
+    with span("prescreen"):
+        screened = prescreen_move(board_before, move)
+    if screened is not None:
+        best_move = screened['best_move']
+        if best_move is None:
+            best_move = engine.play(board_before, chess.engine.Limit(depth=5)).move
+        return {
+            'material_change': material_change,
+            'positional_change': -screened['cpl'],
+            'best_move': board_before.san(best_move),
+            'move_san': move_san,
+            'cpl': screened['cpl'],
+            'is_book': is_book,
+            'opening_info': opening_info
+        }
+    
     # Get engine evaluation before and after
     analysis_before = engine.analyse(board_before, chess.engine.Limit(depth=5))
     score_before = analysis_before["score"].relative.score(mate_score=10000)
@@ -167,64 +383,77 @@ def get_material_count(board):
 
 
 
-@app.post("/move")
+@app.post("/move", dependencies=[Depends(admit("move")), session, Depends(restore_explanations)],
+          response_model=MoveResponse)
+@profiled
 def make_move(req: MoveRequest):
-    global move_history, full_san_sequence
     move_dict = req.move
     move_uci = move_dict['from'] + move_dict['to']
     if 'promotion' in move_dict and move_dict['promotion']:
         move_uci += move_dict['promotion']
     move = chess.Move.from_uci(move_uci)
+    # After a takeback(1) or a jump to a user move it is the engine's turn
+    if not tree.user_to_move():
+        return JSONResponse(status_code=400, content={'error': "Not the player's turn", 'fen': board.fen()})
+    start = tree.current
     try:
-        # Analyze the user's move quality with current sequence
-        analysis_result = analyze_move_quality(board, move, engine, full_san_sequence)
-        
-        # Store FEN before the move
-        fen_before_move = board.fen()
-        
-        # Apply user's move
+        # A move already played from this node (e.g. after a takeback) keeps its analysis
+        known = tree.child(move)
+        if known is not None and known.analysis is not None:
+            tree.play(move)
+            analysis = dict(known.analysis, reused=True)
+        else:
+            if not board.is_legal(move):
+                raise ValueError(f"Illegal move {move_uci} in {board.fen()}")
+            
+            # Analyze the user's move quality with current sequence
+            analysis_result = analyze_move_quality(board, move, engine, full_san_sequence)
+            
+            # Store FEN before the move
+            fen_before_move = board.fen()
+            
+            # Generate feedback for USER'S move only using CPL and book detection
+            classification = classify_move(analysis_result['cpl'], analysis_result['is_book'])
+            
+            # Use opening info from analysis (already computed in analyze_move_quality)
+            opening_info = analysis_result['opening_info']
+            
+            feedback = generate_feedback_message(classification,
+                                               analysis_result['cpl'],
+                                               analysis_result['move_san'],
+                                               analysis_result['best_move'],
+                                               opening_info)
+            
+            # Queue an LLM explanation; the client polls /explanations/{id} for it
+            explanation_id = None
+            if explanations is not None and classification != 'book':
+                explanation_id = explanations.request(fen_before_move,
+                                                      analysis_result['move_san'],
+                                                      classification,
+                                                      analysis_result['best_move'],
+                                                      analysis_result['cpl'])
+            
+            analysis = {
+                'material_change': analysis_result['material_change'],
+                'positional_change': analysis_result['positional_change'],
+                'feedback': feedback,
+                'best_move': analysis_result['best_move'],
+                'user_move': analysis_result['move_san'],
+                'cpl': analysis_result['cpl'],
+                'explanation_id': explanation_id
+            }
+            # Apply user's move and keep its analysis on the node
+            tree.play(move, PLAYED_BY_USER, board).analysis = analysis
+            analysis = dict(analysis, reused=False)
         board.push(move)
         
-        # Update full SAN sequence with user's move
-        full_san_sequence.append(analysis_result['move_san'])
-        
-        # Add user move to history with FEN (before the move)
-        move_data = {
-            'move': analysis_result['move_san'],
-            'fen': fen_before_move  # FEN before the move
-        }
-        move_history.append(move_data)
-        
-        # Generate feedback for USER'S move only using CPL and book detection
-        classification = classify_move(analysis_result['cpl'], analysis_result['is_book'])
-        
-        # Use opening info from analysis (already computed in analyze_move_quality)
-        opening_info = analysis_result['opening_info']
-        
-        feedback = generate_feedback_message(classification,
-                                           analysis_result['cpl'],
-                                           analysis_result['move_san'],
-                                           analysis_result['best_move'],
-                                           opening_info)
-        
-        # Stockfish move - NO ANALYSIS, just apply the move
+        # Stockfish move - NO ANALYSIS, just apply the move (or replay its earlier reply here)
         ai_move = None
         if not board.is_game_over():
-            result = engine.play(board, chess.engine.Limit(depth=5))
-            ai_move = result.move
-            # Store FEN before AI move
-            fen_before_ai_move = board.fen()
-            # Add Stockfish move to history with FEN (before the move)
-            ai_move_san = board.san(ai_move)
-            ai_move_data = {
-                'move': ai_move_san,
-                'fen': fen_before_ai_move  # FEN before the move
-            }
-            move_history.append(ai_move_data)
-            board.push(ai_move)
-
-            # Update full SAN sequence with AI move - this may break the book streak
-            full_san_sequence.append(ai_move_san)
+            ai_move = play_engine_reply()
+        
+        # History, SAN sequence (book streak) and board follow the tree's current line
+        sync_from_tree()
         
         return {
             'fen': board.fen(),
@@ -232,28 +461,93 @@ def make_move(req: MoveRequest):
             'is_game_over': board.is_game_over(),
             'result': board.result() if board.is_game_over() else None,
             'move_history': move_history,
-            'analysis': {
-                'material_change': analysis_result['material_change'],
-                'positional_change': analysis_result['positional_change'],
-                'feedback': feedback,
-                'best_move': analysis_result['best_move'],
-                'user_move': analysis_result['move_san'],
-                'cpl': analysis_result['cpl']
-            }
+            'node_id': tree.current.id,
+            'analysis': analysis
         }
     except Exception as e:
+        # Put the tree, board and history back where the move started (a new user
+        # node keeps its analysis in the tree, so retrying the move reuses it)
+        tree.goto(start.id)
+        sync_from_tree()
         return JSONResponse(status_code=400, content={'error': str(e), 'fen': board.fen()})
 
-@app.post("/reset")
-def reset():
-    global board, move_history, full_san_sequence
-    board = chess.Board()
-    move_history = []
-    full_san_sequence = []
-    reset_book_logic()  # Reset the book logic state
-    return {'fen': board.fen()}
+def play_engine_reply():
+    """Replay the engine's earlier reply from the current node, or have the opponent find one"""
+    reply = tree.reply()
+    if reply is not None:
+        ai_move = reply.move
+    else:
+        ai_move = traced_engines[opponent_profile].play(board, chess.engine.Limit(depth=5)).move
+    tree.play(ai_move, PLAYED_BY_ENGINE, board)
+    return ai_move
 
-@app.post("/store-game")
+def tree_position():
+    """Current position and line, returned after a takeback or jump"""
+    return {
+        'fen': board.fen(),
+        'is_game_over': board.is_game_over(),
+        'result': board.result() if board.is_game_over() else None,
+        'move_history': move_history,
+        'node_id': tree.current.id,
+        'user_to_move': tree.user_to_move()
+    }
+
+@app.post("/takeback", dependencies=[session])
+def takeback(req: TakebackRequest):
+    """Step back along the current line; the moves taken back remain as a branch"""
+    start = tree.current
+    tree.takeback(req.plies)
+    # Replaying the engine's reply would just undo the takeback, so the player must stay on move
+    if not tree.user_to_move():
+        tree.goto(start.id)
+        return JSONResponse(status_code=400, content={
+            "error": "That takeback would leave the engine to move"})
+    sync_from_tree()
+    return tree_position()
+
+@app.post("/goto", dependencies=[session])
+def goto_node(req: GotoRequest):
+    """Jump to any node of the variation tree; at a user move the engine's reply follows"""
+    start = tree.current
+    try:
+        tree.goto(req.node_id)
+    except KeyError:
+        return JSONResponse(status_code=404, content={"error": "Node not found"})
+    sync_from_tree()
+    if not tree.user_to_move() and not board.is_game_over():
+        try:
+            if tree.reply() is not None:
+                play_engine_reply()
+            else:
+                with admission.admit("move"):
+                    play_engine_reply()
+        except Exception as e:
+            # Back where the jump started, so the player is never left without a move
+            tree.goto(start.id)
+            sync_from_tree()
+            if isinstance(e, AdmissionRejected):
+                raise  # Answered with 429 by admission_rejected_handler
+            return JSONResponse(status_code=400, content={'error': str(e), 'fen': board.fen()})
+        sync_from_tree()
+    return tree_position()
+
+@app.get("/tree", dependencies=[session])
+def get_tree():
+    """Every explored line: nodes with their moves, stored analysis and children"""
+    return tree.to_dict()
+
+@app.post("/reset", dependencies=[session])
+def reset(req: Optional[ResetRequest] = None):
+    global tree, opponent_profile
+    opponent = req.opponent if req is not None and req.opponent else REVIEWER_PROFILE
+    if opponent not in engine_profiles.profiles:
+        return JSONResponse(status_code=400, content={"error": f"Unknown engine profile: {opponent}"})
+    opponent_profile = opponent
+    tree = VariationTree()
+    sync_from_tree()  # Also resets the book logic state
+    return {'fen': board.fen(), 'opponent': opponent_profile}
+
+@app.post("/store-game", dependencies=[games])
 def store_game(request: Request):
     import uuid
     import asyncio
@@ -261,7 +555,10 @@ def store_game(request: Request):
     async def get_body():
         return await request.json()
     
-    game_data = asyncio.run(get_body())
+    try:
+        game_data = parse_stored_game(asyncio.run(get_body()))
+    except ValueError as e:  # Malformed JSON or a game that doesn't fit StoredGame
+        return JSONResponse(status_code=400, content={"error": f"Invalid game: {e}"})
     game_id = str(uuid.uuid4())
     
     # Add timestamp for display
@@ -273,15 +570,30 @@ def store_game(request: Request):
         stored_games.popitem(last=False)  # Remove oldest (first item)
     
     stored_games[game_id] = game_data
-    return {"game_id": game_id}
+    
+    try:
+        position_index.add_game(game_id, game_data.get('moves', []))
+    except ValueError:
+        pass  # Unparseable move list - the game is still stored, just not searchable
+    
+    # Enrich every ply in the background - reviews read the precomputed result
+    review_queue.submit(game_id, game_data)
+    return {"game_id": game_id, "status": game_data['status']}
 
-@app.get("/game/{game_id}")
-def get_game(game_id: str):
-    if game_id in stored_games:
-        return stored_games[game_id]
-    return {"error": "Game not found"}
+@app.get("/game/{game_id}", dependencies=[games], response_model=StoredGame)
+def get_game(game_id: str, request: Request):
+    """Return a stored game; 'analysis' is included once 'status' is 'ready'"""
+    game_data = stored_games.get(game_id)
+    if game_data is None:
+        return JSONResponse(content={"error": "Game not found"})
+    # Games were checked against StoredGame when stored, so both paths send the
+    # stored dict as is; finished reviews are encoded once and cached
+    if game_data.get('status') in (STATUS_READY, STATUS_FAILED):
+        return game_bodies.response(game_id, game_data, request.headers.get('accept-encoding', ''))
+    # A copy, since the review worker may add the analysis meanwhile
+    return Response(encode_json(dict(game_data)), media_type='application/json')
 
-@app.get("/games")
+@app.get("/games", dependencies=[games])
 def list_games():
     """List all stored games with basic info"""
     games_list = []
@@ -291,13 +603,137 @@ def list_games():
             "result": game_data.get("result", "Unknown"),
             "timestamp": game_data.get("timestamp", "Unknown"),
             "move_count": len(game_data.get("moves", [])),
+            "status": game_data.get("status"),
             "url": f"/review?id={game_id}"
         })
     return {"games": games_list, "total": len(games_list), "max_limit": MAX_STORED_GAMES}
 
+@app.get("/stats")
+def get_stats(last: Optional[int] = None):
+    """Accuracy, ACPL, classification histograms and opening frequency across games"""
+    return game_stats.summary(last)
+
+@app.get("/stats/games")
+def get_game_stats(limit: int = 20):
+    """Per-game statistics for the most recently reviewed games"""
+    return {"games": game_stats.recent_games(limit)}
+
+@app.get("/positions/search", dependencies=[games])
+def search_positions(fen: Optional[str] = None, material: Optional[str] = None,
+                     eco: Optional[str] = None, limit: int = 100):
+    """
+    Find (game_id, ply) pairs where a position, material balance or opening arose.
+    The index also covers archived games (evicted from review storage or
+    indexed offline); 'stored' tells whether /game/{id} can still return one.
+    """
+    try:
+        if fen:
+            total, postings = position_index.search_fen(fen, limit)
+        elif material:
+            total, postings = position_index.search_material(material, limit)
+        elif eco:
+            total, postings = position_index.search_eco(eco, limit)
+        else:
+            return JSONResponse(status_code=400, content={"error": "Specify fen, material or eco"})
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    for posting in postings:
+        posting['stored'] = posting['game_id'] in stored_games
+    return {"total": total, "postings": postings}
+
+@app.get("/explorer", dependencies=[session])
+def explore(fen: Optional[str] = None):
+    """Candidate moves from a position (default: the current one) with games, score and average CPL"""
+    try:
+        return explorer.lookup(fen or board.fen())
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+
+@app.get("/explorer/stats")
+def explorer_stats():
+    return explorer.stats()
+
+@app.get("/explanations/{explanation_id}", dependencies=[Depends(restore_explanations)])
+def get_explanation(explanation_id: str):
+    """Poll for a move explanation: status is 'pending', 'ready' or 'failed'"""
+    entry = explanations.get(explanation_id) if explanations is not None else None
+    if entry is None:
+        return JSONResponse(status_code=404, content={"error": "Explanation not found"})
+    return entry
+
+@app.get("/prescreen/stats")
+def get_prescreen_stats():
+    """How many moves were classified without the engine, and searches avoided"""
+    return prescreen_summary()
+
+@app.get("/admission")
+def admission_status():
+    """Current admission state (normal / shedding / overloaded) and queue wait estimates"""
+    return admission.status()
+
+@app.get("/profiles")
+def list_profiles(request: Request):
+    """Recent request profiles (admin token required)"""
+    if not profiler.is_admin(request.headers.get("x-admin-token")):
+        return JSONResponse(status_code=403, content={"error": "Admin token required"})
+    return {"profiles": profiler.reports()}
+
+@app.get("/profiles/{profile_id}")
+def get_profile(profile_id: str, request: Request):
+    """A request profile: engine and handler spans plus the hottest functions (admin token required)"""
+    if not profiler.is_admin(request.headers.get("x-admin-token")):
+        return JSONResponse(status_code=403, content={"error": "Admin token required"})
+    report = profiler.get(profile_id)
+    if report is None:
+        return JSONResponse(status_code=404, content={"error": "Profile not found"})
+    return report
+
+@app.get("/warm-restart")
+def warm_restart_status():
+    """Which snapshot sections are still waiting to be restored, and how long restores took"""
+    return warm_restart.status()
+
+@app.get("/engine/status")
+def engine_status():
+    """Per-profile scheduler queues, scaling and the state of every supervised engine"""
+    return engine_profiles.status()
+
+@app.post("/engine/restart")
+def restart_engine():
+    """Drain in-flight searches and restart every engine"""
+    engine_profiles.restart()
+    return engine_profiles.status()
+
+# Registered last so the catch-all never shadows an API route
+static_build = StaticBuild()
+if RELEASE:
+    @app.get("/{path:path}", include_in_schema=False)
+    def frontend(request: Request, path: str):
+        """Prebuilt frontend assets (precompressed, hashed files cached for a year)"""
+        return static_build.response(request, path)
+
+@app.on_event("startup")
+def startup_event():
+    if RELEASE:
+        static_build.load()
+    engine_profiles.start()
+    if explanations is not None:
+        explanations.start()
+    game_stats.load()
+    position_index.load()
+    explorer.load()
+    review_queue.start()
+
 @app.on_event("shutdown")
 def shutdown_event():
-    engine.quit()
+    review_queue.stop()
+    if explanations is not None:
+        explanations.stop()
+    warm_restart.save()
+    game_stats.flush()
+    position_index.compact()
+    explorer.flush()
+    engine_profiles.quit()
 
 def main():
     """Main entry point for the chess application"""
@@ -318,9 +754,12 @@ def main():
         if os.path.exists(frontend_path):
             subprocess.Popen(["npm", "start"], cwd=frontend_path)
     
+    # In release mode this server also serves the prebuilt frontend
+    frontend_url = "http://localhost:8000" if RELEASE else "http://localhost:3000"
+    
     print("🚀 Starting ChessMentor-AI...")
     print("📡 Backend API: http://localhost:8000")
-    print("🎮 Frontend GUI: http://localhost:3000")
+    print(f"🎮 Frontend GUI: {frontend_url}")
     
     # Start backend in a separate thread
     server_thread = threading.Thread(target=start_server, daemon=True)
@@ -331,10 +770,14 @@ def main():
     
     # Start frontend
     try:
-        start_frontend()
-        time.sleep(3)
+        if RELEASE:
+            if not static_build.available:
+                print("⚠️  No frontend build found - run: cd stchess/component_board/frontend && npm run build")
+        else:
+            start_frontend()
+            time.sleep(3)
         # Open browser to the React app
-        webbrowser.open("http://localhost:3000")
+        webbrowser.open(frontend_url)
     except Exception as e:
         print(f"⚠️  Could not start frontend automatically: {e}")
         print("🔧 Please run manually: cd stchess/component_board/frontend && npm start")
@@ -0,0 +1,259 @@
+"""
+Game review module.
+Precomputes per-ply analysis (evaluation, best move, CPL, classification) for
+stored games on background workers, so opening a review never waits on Stockfish.
+"""
+
+import math
+import queue
+import threading
+import traceback
+from typing import Callable, Dict, List, Optional
+
+import chess
+import chess.engine
+
+from move_classification import classify_move
+from openings import matching_openings, identify_opening
+
+MATE_SCORE = 10000
+
+# Evaluations are clamped to this many centipawns before computing CPL, so a
+# single missed mate does not dominate a player's average
+CPL_EVAL_CAP = 1000
+
+# Review status values exposed on stored games
+STATUS_QUEUED = 'queued'
+STATUS_ANALYZING = 'analyzing'
+STATUS_READY = 'ready'
+STATUS_FAILED = 'failed'
+
+
+def win_percent(cp):
+    """Convert a centipawn evaluation (side to move) to a winning chance in [0, 100]."""
+    cp = max(-CPL_EVAL_CAP, min(CPL_EVAL_CAP, cp))
+    return 50 + 50 * (2 / (1 + math.exp(-0.00368208 * cp)) - 1)
+
+def move_accuracy(win_before, win_after):
+    """
+    Accuracy of a single move from the mover's winning chances before and after it
+    (Lichess-style formula, as used by the Chess.com style accuracy summaries).
+    """
+    drop = max(0.0, win_before - win_after)
+    accuracy = 103.1668 * math.exp(-0.04354 * drop) - 3.1669
+    return max(0.0, min(100.0, accuracy))
+
+def _evaluate(board, engine, limit):
+    """
+    Evaluate a position for the side to move.
+
+    Returns:
+        tuple: (score in centipawns relative to the side to move, best move or None)
+    """
+    # Terminal positions don't need a search
+    if board.is_checkmate():
+        return -MATE_SCORE, None
+    if board.is_game_over():
+        return 0, None
+
+    info = engine.analyse(board, limit)
+    score = info["score"].relative.score(mate_score=MATE_SCORE)
+    pv = info.get("pv")
+    best_move = pv[0] if pv else None
+    if best_move is None:
+        best_move = engine.play(board, limit).move
+    return score, best_move
+
+def analyze_game(moves, engine, limit):
+    """
+    Analyze every ply of a stored game.
+
+    Each position is searched once: the CPL of a move is derived from the
+    evaluation before it and the (negated) evaluation of the position it leads to.
+
+    Args:
+        moves (list): Stored move list - dicts with 'move' (SAN) and 'fen' (FEN before the move)
+        engine: Object with python-chess style analyse()/play() methods
+        limit (chess.engine.Limit): Search limit per position
+
+    Returns:
+        dict: {'plies': [...], 'summary': {...}, 'opening': {...} or None}
+    """
+    start_fen = moves[0]['fen'] if moves and moves[0].get('fen') else chess.STARTING_FEN
+    board = chess.Board(start_fen)
+
+    boards = [board.copy(stack=False)]
+    parsed_moves = []
+    for move_data in moves:
+        move = board.parse_san(move_data['move'])
+        parsed_moves.append(move)
+        board.push(move)
+        boards.append(board.copy(stack=False))
+
+    evaluations = [_evaluate(position, engine, limit) for position in boards]
+
+    plies = []
+    san_sequence = []
+    in_book = start_fen == chess.STARTING_FEN
+    for i, move in enumerate(parsed_moves):
+        position = boards[i]
+        score_before, best_move = evaluations[i]
+        score_after = -evaluations[i + 1][0]  # Back to the mover's perspective
+
+        move_san = position.san(move)
+        san_sequence.append(move_san)
+        in_book = in_book and bool(matching_openings(san_sequence))
+
+        # Playing the engine's best move loses nothing, even if the search of the
+        # next position disagrees slightly; CPL and accuracy both use this score
+        judged_after = score_before if best_move is None or move == best_move else score_after
+        capped_before = max(-CPL_EVAL_CAP, min(CPL_EVAL_CAP, score_before))
+        capped_after = max(-CPL_EVAL_CAP, min(CPL_EVAL_CAP, judged_after))
+        cpl = max(0, capped_before - capped_after)
+
+        white_eval = score_after if position.turn == chess.WHITE else -score_after
+        plies.append({
+            'ply': i + 1,
+            'color': 'white' if position.turn == chess.WHITE else 'black',
+            'move': move_san,
+            'fen': position.fen(),
+            'eval': white_eval,
+            'best_move': position.san(best_move) if best_move else None,
+            'cpl': cpl,
+            'classification': classify_move(cpl, in_book),
+            'accuracy': round(move_accuracy(win_percent(score_before), win_percent(judged_after)), 1)
+        })
+
+    return {
+        'plies': plies,
+        'summary': summarize_plies(plies),
+        'opening': identify_opening(san_sequence)
+    }
+
+def summarize_plies(plies):
+    """Build per-side accuracy, average CPL and classification counts."""
+    summary = {}
+    for color in ('white', 'black'):
+        side = [ply for ply in plies if ply['color'] == color]
+        counts = {}
+        for ply in side:
+            counts[ply['classification']] = counts.get(ply['classification'], 0) + 1
+        summary[color] = {
+            'moves': len(side),
+            'accuracy': round(sum(p['accuracy'] for p in side) / len(side), 1) if side else None,
+            'acpl': round(sum(p['cpl'] for p in side) / len(side), 1) if side else None,
+            'classifications': counts
+        }
+    return summary
+
+
+class GameReviewQueue:
+    """
+    Bounded queue of stored games waiting for review, drained by background workers.
+
+    Each worker gets its engine from engine_factory. The app passes a
+    PriorityEngine handle, so all workers share the scheduler's engine pool at
+    background priority and never hold up interactive requests; the scheduler
+    owns those engines. A factory may instead start a dedicated process per
+    worker (a bare SimpleEngine cancels the running command when a new one
+    arrives, so it can't be shared between threads).
+    """
+
+    def __init__(self, engine_factory: Callable, workers: int = 1, max_pending: int = 16,
+                 limit: Optional[chess.engine.Limit] = None):
+        """
+        Args:
+            engine_factory: Callable returning the engine a worker uses (e.g. a
+                PriorityEngine on the shared scheduler, or SimpleEngine.popen_uci)
+            workers: Number of worker threads
+            max_pending: Maximum number of games waiting for review
+            limit: Search limit per position (default depth 10)
+        """
+        self.engine_factory = engine_factory
+        self.workers = workers
+        self.limit = limit or chess.engine.Limit(depth=10)
+        self._jobs = queue.Queue(maxsize=max_pending)
+        self._threads: List[threading.Thread] = []
+        self._listeners: List[Callable] = []
+        self._stopping = threading.Event()
+
+    def add_listener(self, callback: Callable):
+        """Register callback(game_id, game_data) to run after a game is reviewed."""
+        self._listeners.append(callback)
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"game-review-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping.set()
+        for _ in self._threads:
+            try:
+                self._jobs.put_nowait(None)
+            except queue.Full:
+                pass
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def pending(self) -> int:
+        return self._jobs.qsize()
+
+    def submit(self, game_id: str, game_data: Dict) -> bool:
+        """
+        Queue a stored game for review. Sets game_data['status'].
+
+        Returns:
+            bool: False if the queue is full (the game is marked as failed)
+        """
+        game_data['status'] = STATUS_QUEUED
+        try:
+            self._jobs.put_nowait((game_id, game_data))
+            return True
+        except queue.Full:
+            game_data['status'] = STATUS_FAILED
+            game_data['error'] = 'Review queue is full'
+            return False
+
+    def _worker(self):
+        engine = None
+        while not self._stopping.is_set():
+            job = self._jobs.get()
+            if job is None:
+                break
+            game_id, game_data = job
+            game_data['status'] = STATUS_ANALYZING
+            try:
+                if engine is None:
+                    engine = self.engine_factory()
+                game_data['analysis'] = analyze_game(game_data.get('moves', []), engine, self.limit)
+                game_data['status'] = STATUS_READY
+            except chess.engine.EngineError as e:
+                # Engine died or misbehaved - get a fresh one for the next job (quitting a
+                # shared PriorityEngine handle is a no-op; the scheduler restarts its engines)
+                game_data['status'] = STATUS_FAILED
+                game_data['error'] = str(e)
+                engine = _close_quietly(engine)
+            except Exception as e:
+                game_data['status'] = STATUS_FAILED
+                game_data['error'] = str(e)
+            finally:
+                self._jobs.task_done()
+
+            if game_data['status'] == STATUS_READY:
+                for callback in self._listeners:
+                    try:
+                        callback(game_id, game_data)
+                    except Exception:
+                        traceback.print_exc()
+        _close_quietly(engine)
+
+def _close_quietly(engine):
+    if engine is not None:
+        try:
+            engine.quit()
+        except Exception:
+            pass
+    return None
@@ -0,0 +1,231 @@
+"""
+Game statistics module.
+Aggregates per-game accuracy, average CPL, classification histograms and opening
+frequency over the game archive. Rows are kept in columnar form and persisted as
+Parquet part files; running totals are updated incrementally as games are
+reviewed so dashboard queries don't rescan the archive.
+"""
+
+import os
+import threading
+from collections import Counter
+from typing import Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from move_classification import CLASSIFICATIONS
+
+COLORS = ('white', 'black')
+
+STATS_SCHEMA = pa.schema(
+    [
+        ('game_id', pa.string()),
+        ('timestamp', pa.string()),
+        ('result', pa.string()),
+        ('plies', pa.int32()),
+        ('eco', pa.string()),
+        ('opening', pa.string()),
+    ]
+    + [(f'{color}_moves', pa.int32()) for color in COLORS]
+    + [(f'{color}_accuracy', pa.float64()) for color in COLORS]
+    + [(f'{color}_cpl_sum', pa.int64()) for color in COLORS]
+    + [(f'{color}_{label}', pa.int32()) for color in COLORS for label in CLASSIFICATIONS]
+)
+
+
+def game_stats_row(game_id, game_data):
+    """
+    Flatten a reviewed game into one statistics row.
+
+    Args:
+        game_id (str): Stored game id
+        game_data (dict): Stored game with a ready 'analysis' (see game_review.analyze_game)
+
+    Returns:
+        dict: Column name -> value, matching STATS_SCHEMA
+    """
+    analysis = game_data['analysis']
+    opening = analysis.get('opening') or {}
+    row = {
+        'game_id': game_id,
+        'timestamp': game_data.get('timestamp'),
+        'result': game_data.get('result'),
+        'plies': len(analysis['plies']),
+        'eco': opening.get('eco'),
+        'opening': opening.get('name'),
+    }
+    for color in COLORS:
+        side = analysis['summary'][color]
+        row[f'{color}_moves'] = side['moves']
+        row[f'{color}_accuracy'] = side['accuracy']
+        row[f'{color}_cpl_sum'] = sum(p['cpl'] for p in analysis['plies'] if p['color'] == color)
+        for label in CLASSIFICATIONS:
+            row[f'{color}_{label}'] = side['classifications'].get(label, 0)
+    return row
+
+
+def _empty_totals():
+    totals = {
+        'games': 0,
+        'results': Counter(),
+        'openings': Counter(),
+    }
+    for color in COLORS:
+        totals[f'{color}_moves'] = 0
+        totals[f'{color}_cpl_sum'] = 0
+        totals[f'{color}_accuracy_sum'] = 0.0
+        totals[f'{color}_accuracy_games'] = 0
+        totals[f'{color}_classifications'] = Counter()
+    return totals
+
+def _add_row_to_totals(totals, row):
+    totals['games'] += 1
+    totals['results'][row['result']] += 1
+    if row['opening']:
+        totals['openings'][(row['eco'], row['opening'])] += 1
+    for color in COLORS:
+        totals[f'{color}_moves'] += row[f'{color}_moves']
+        totals[f'{color}_cpl_sum'] += row[f'{color}_cpl_sum']
+        if row[f'{color}_accuracy'] is not None:
+            totals[f'{color}_accuracy_sum'] += row[f'{color}_accuracy']
+            totals[f'{color}_accuracy_games'] += 1
+        for label in CLASSIFICATIONS:
+            totals[f'{color}_classifications'][label] += row[f'{color}_{label}']
+
+def _add_table_to_totals(totals, table):
+    """Vectorised equivalent of _add_row_to_totals for a whole table."""
+    totals['games'] += table.num_rows
+    for entry in pc.value_counts(table['result']).to_pylist():
+        totals['results'][entry['values']] += entry['counts']
+    openings = table.filter(pc.is_valid(table['opening']))
+    grouped = openings.group_by(['eco', 'opening']).aggregate([('game_id', 'count')])
+    for eco, name, count in zip(grouped['eco'].to_pylist(), grouped['opening'].to_pylist(),
+                                grouped['game_id_count'].to_pylist()):
+        totals['openings'][(eco, name)] += count
+    for color in COLORS:
+        totals[f'{color}_moves'] += pc.sum(table[f'{color}_moves']).as_py() or 0
+        totals[f'{color}_cpl_sum'] += pc.sum(table[f'{color}_cpl_sum']).as_py() or 0
+        totals[f'{color}_accuracy_sum'] += pc.sum(table[f'{color}_accuracy']).as_py() or 0.0
+        totals[f'{color}_accuracy_games'] += pc.count(table[f'{color}_accuracy']).as_py()
+        for label in CLASSIFICATIONS:
+            totals[f'{color}_classifications'][label] += pc.sum(table[f'{color}_{label}']).as_py() or 0
+
+
+class GameStatsStore:
+    """Columnar store of per-game statistics with incrementally maintained totals."""
+
+    def __init__(self, directory: Optional[str] = None, flush_every: int = 256):
+        """
+        Args:
+            directory: Directory for Parquet part files (None keeps everything in memory)
+            flush_every: Number of new games buffered before a part file is written
+        """
+        self.directory = directory
+        self.flush_every = flush_every
+        self._lock = threading.Lock()
+        self._table = STATS_SCHEMA.empty_table()
+        self._pending: Dict[str, List] = {name: [] for name in STATS_SCHEMA.names}
+        self._parts = 0
+        self._totals = _empty_totals()
+
+    def load(self):
+        """Load previously persisted part files and rebuild the running totals."""
+        if not self.directory or not os.path.isdir(self.directory):
+            return
+        files = sorted(f for f in os.listdir(self.directory) if f.endswith('.parquet'))
+        if not files:
+            return
+        tables = [pq.read_table(os.path.join(self.directory, f), schema=STATS_SCHEMA) for f in files]
+        with self._lock:
+            self._table = pa.concat_tables(tables)
+            self._parts = len(files)
+            self._totals = _empty_totals()
+            _add_table_to_totals(self._totals, self._table)
+
+    def add_game(self, game_id, game_data):
+        """Record a reviewed game. Intended as a GameReviewQueue listener."""
+        row = game_stats_row(game_id, game_data)
+        with self._lock:
+            for name in STATS_SCHEMA.names:
+                self._pending[name].append(row[name])
+            _add_row_to_totals(self._totals, row)
+            if len(self._pending['game_id']) >= self.flush_every:
+                self._flush_locked()
+
+    def flush(self):
+        """Write buffered rows to a new Parquet part file."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending['game_id']:
+            return
+        batch = pa.table(self._pending, schema=STATS_SCHEMA)
+        self._table = pa.concat_tables([self._table, batch])
+        self._pending = {name: [] for name in STATS_SCHEMA.names}
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            self._parts += 1
+            pq.write_table(batch, os.path.join(self.directory, f'part-{self._parts:05d}.parquet'))
+
+    def _combined_table(self):
+        if not self._pending['game_id']:
+            return self._table
+        return pa.concat_tables([self._table, pa.table(self._pending, schema=STATS_SCHEMA)])
+
+    def summary(self, last: Optional[int] = None) -> Dict:
+        """
+        Aggregate statistics over the archive.
+
+        Args:
+            last: Only include the most recent N games (None uses the running totals)
+
+        Returns:
+            dict: Game count, results, per-side accuracy/ACPL/classification
+                  histograms and opening frequency
+        """
+        with self._lock:
+            if last is None:
+                totals = self._totals
+            else:
+                table = self._combined_table()
+                table = table.slice(max(0, table.num_rows - last))
+                totals = _empty_totals()
+                _add_table_to_totals(totals, table)
+
+            players = {}
+            for color in COLORS:
+                moves = totals[f'{color}_moves']
+                accuracy_games = totals[f'{color}_accuracy_games']
+                players[color] = {
+                    'accuracy': round(totals[f'{color}_accuracy_sum'] / accuracy_games, 1) if accuracy_games else None,
+                    'acpl': round(totals[f'{color}_cpl_sum'] / moves, 1) if moves else None,
+                    'classifications': {label: totals[f'{color}_classifications'][label] for label in CLASSIFICATIONS}
+                }
+            return {
+                'games': totals['games'],
+                'results': dict(totals['results']),
+                'players': players,
+                'openings': [
+                    {'eco': eco, 'name': name, 'games': count}
+                    for (eco, name), count in totals['openings'].most_common()
+                ]
+            }
+
+    def recent_games(self, limit: int = 20) -> List[Dict]:
+        """
+        Per-game statistics rows for the most recent games, newest first, with
+        each side's average CPL ({color}_acpl) added to the stored columns.
+        """
+        with self._lock:
+            table = self._combined_table()
+            table = table.slice(max(0, table.num_rows - limit))
+            rows = table.to_pylist()
+        rows.reverse()
+        for row in rows:
+            for color in COLORS:
+                moves = row[f'{color}_moves']
+                row[f'{color}_acpl'] = round(row[f'{color}_cpl_sum'] / moves, 1) if moves else None
+        return rows
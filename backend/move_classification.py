@@ -15,6 +15,9 @@ PIECE_VALUES = {
     chess.KING: 20000
 }
 
+# Every label classify_move() can return, best to worst
+CLASSIFICATIONS = ['brilliant', 'best', 'excellent', 'good', 'book', 'inaccuracy', 'mistake', 'blunder']
+
 def classify_move(cpl, is_book=False):
     """
     Classify a move based on Centipawn Loss (CPL) using Chess.com-style thresholds.
@@ -0,0 +1,187 @@
+"""
+Opening explorer.
+Keeps per-position move statistics - games, results and average CPL of every
+move played from a position - in a Zobrist-keyed table that is updated
+incrementally as reviewed games arrive, so a lookup is a dictionary access no
+matter how large the archive is. Book moves from the opening database are
+included even before any game has played them. The table is persisted as Parquet.
+"""
+
+import os
+import threading
+from typing import Dict, List, Optional
+
+import chess
+import chess.polyglot
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from openings import OPENINGS, identify_opening
+
+EXPLORER_SCHEMA = pa.schema([
+    ('key', pa.uint64()),
+    ('move', pa.string()),  # UCI
+    ('games', pa.uint32()),
+    ('white', pa.uint32()),
+    ('draws', pa.uint32()),
+    ('black', pa.uint32()),
+    ('cpl_sum', pa.int64()),
+    ('cpl_count', pa.uint32()),
+])
+
+# Counter positions in a move's statistics list
+GAMES, WHITE, DRAWS, BLACK, CPL_SUM, CPL_COUNT = range(6)
+
+RESULT_COLUMNS = {'1-0': WHITE, '1/2-1/2': DRAWS, '0-1': BLACK}
+
+
+def book_moves() -> Dict[int, Dict[str, Dict]]:
+    """
+    Zobrist key -> {UCI: opening} for every move of every line in the opening database.
+    A move is named after the opening reached once it is played (1.e4 e5 is still
+    the King's Pawn Opening), or None when it completes no line.
+    """
+    book: Dict[int, Dict[str, Dict]] = {}
+    for opening in OPENINGS:
+        board = chess.Board()
+        for i, san in enumerate(opening["moves"]):
+            move = board.parse_san(san)
+            book.setdefault(chess.polyglot.zobrist_hash(board), {})[move.uci()] = \
+                identify_opening(opening["moves"][:i + 1])
+            board.push(move)
+    return book
+
+
+class OpeningExplorer:
+    """Zobrist-keyed move statistics over the game archive plus the opening book."""
+
+    def __init__(self, path: Optional[str] = None, max_ply: int = 30):
+        """
+        Args:
+            path: Parquet file for the statistics table (None keeps it in memory only)
+            max_ply: Only the first max_ply plies of each game are counted
+        """
+        self.path = path
+        self.max_ply = max_ply
+        self._lock = threading.Lock()
+        self._table: Dict[int, Dict[str, List[int]]] = {}
+        self._book = book_moves()
+        self._dirty = False
+        self._games = 0
+
+    def load(self):
+        """Load the persisted statistics table."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        columns = pq.read_table(self.path, schema=EXPLORER_SCHEMA).to_pydict()
+        table: Dict[int, Dict[str, List[int]]] = {}
+        for i, key in enumerate(columns['key']):
+            table.setdefault(key, {})[columns['move'][i]] = [
+                columns['games'][i], columns['white'][i], columns['draws'][i],
+                columns['black'][i], columns['cpl_sum'][i], columns['cpl_count'][i]
+            ]
+        with self._lock:
+            self._table = table
+            self._dirty = False
+
+    def flush(self):
+        """Write the table if it changed (atomically replaces the file)."""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            columns = {name: [] for name in EXPLORER_SCHEMA.names}
+            for key, moves in self._table.items():
+                for uci, counts in moves.items():
+                    columns['key'].append(key)
+                    columns['move'].append(uci)
+                    for name, value in zip(EXPLORER_SCHEMA.names[2:], counts):
+                        columns[name].append(value)
+            self._dirty = False
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        pq.write_table(pa.table(columns, schema=EXPLORER_SCHEMA), tmp_path)
+        os.replace(tmp_path, self.path)
+
+    def add_game(self, game_id, game_data):
+        """Count a game's opening moves. Intended as a GameReviewQueue listener (uses per-ply CPL)."""
+        moves = game_data.get('moves', [])
+        if not moves:
+            return
+        plies = (game_data.get('analysis') or {}).get('plies', [])
+        result_column = RESULT_COLUMNS.get(game_data.get('result'))
+
+        board = chess.Board(moves[0].get('fen') or chess.STARTING_FEN)
+        updates = []
+        try:
+            for i, move_data in enumerate(moves[:self.max_ply]):
+                move = board.parse_san(move_data['move'])
+                cpl = plies[i]['cpl'] if i < len(plies) else None
+                updates.append((chess.polyglot.zobrist_hash(board), move.uci(), cpl))
+                board.push(move)
+        except ValueError:
+            pass  # Count the legal prefix of a corrupt move list
+
+        with self._lock:
+            for key, uci, cpl in updates:
+                counts = self._table.setdefault(key, {}).setdefault(uci, [0, 0, 0, 0, 0, 0])
+                counts[GAMES] += 1
+                if result_column is not None:
+                    counts[result_column] += 1
+                if cpl is not None:
+                    counts[CPL_SUM] += cpl
+                    counts[CPL_COUNT] += 1
+            self._games += 1
+            self._dirty = True
+
+    def lookup(self, fen: str) -> Dict:
+        """
+        Candidate moves from a position.
+
+        Args:
+            fen: Position to explore
+
+        Returns:
+            dict: {'fen', 'games', 'moves': [{move, uci, games, white, draws, black,
+                   score (percent for the side to move), avg_cpl, book, opening}]} -
+                  moves sorted by games played, book moves first among unplayed ones
+        """
+        board = chess.Board(fen)
+        key = chess.polyglot.zobrist_hash(board)
+        with self._lock:
+            stats = {uci: list(counts) for uci, counts in self._table.get(key, {}).items()}
+        book = self._book.get(key, {})
+
+        moves = []
+        for uci in stats.keys() | book.keys():
+            move = chess.Move.from_uci(uci)
+            if not board.is_legal(move):
+                continue  # Zobrist collision
+            counts = stats.get(uci, [0, 0, 0, 0, 0, 0])
+            decided = counts[WHITE] + counts[DRAWS] + counts[BLACK]
+            wins = counts[WHITE] if board.turn == chess.WHITE else counts[BLACK]
+            opening = book.get(uci)
+            moves.append({
+                'move': board.san(move),
+                'uci': uci,
+                'games': counts[GAMES],
+                'white': counts[WHITE],
+                'draws': counts[DRAWS],
+                'black': counts[BLACK],
+                'score': round(100 * (wins + counts[DRAWS] / 2) / decided, 1) if decided else None,
+                'avg_cpl': round(counts[CPL_SUM] / counts[CPL_COUNT], 1) if counts[CPL_COUNT] else None,
+                'book': uci in book,
+                'opening': {'eco': opening['eco'], 'name': opening['name']} if opening else None
+            })
+        moves.sort(key=lambda m: (-m['games'], not m['book'], m['move']))
+        return {'fen': board.fen(), 'games': sum(m['games'] for m in moves), 'moves': moves}
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'positions': len(self._table),
+                'moves': sum(len(moves) for moves in self._table.values()),
+                'games_added': self._games,
+                'book_positions': len(self._book)
+            }
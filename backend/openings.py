@@ -186,6 +186,44 @@ OPENING_LINES_SAN: List[List[str]] = [
 ]
 
 
+def matching_openings(san_sequence: List[str]) -> List[Dict]:
+    """
+    Find every opening whose line starts with the given SAN sequence.
+    Unlike check_book_move_for_user this keeps no state, so it can be used
+    on stored games and from background workers.
+    
+    Args:
+        san_sequence: Sequence of ALL moves (both sides) in SAN notation
+        
+    Returns:
+        list: Openings still "in book" after the sequence (empty when out of book)
+    """
+    n = len(san_sequence)
+    return [
+        opening for opening in OPENINGS
+        if len(opening["moves"]) >= n and opening["moves"][:n] == san_sequence
+    ]
+
+def identify_opening(san_sequence: List[str]) -> Optional[Dict]:
+    """
+    Identify the opening played in a game.
+    
+    Args:
+        san_sequence: Sequence of ALL moves (both sides) in SAN notation
+        
+    Returns:
+        dict: The opening with the longest line fully contained at the start of
+              the sequence, or None if no opening line was completed
+    """
+    best = None
+    for opening in OPENINGS:
+        line = opening["moves"]
+        if len(line) <= len(san_sequence) and san_sequence[:len(line)] == line:
+            if best is None or len(line) > len(best["moves"]):
+                best = opening
+    return best
+
+
 # Global book logic state
 book_logic_active = True
 candidate_openings = []
@@ -0,0 +1,202 @@
+"""
+Position search index module.
+Maps Zobrist keys, material signatures and opening ECO codes to (game, ply)
+postings. Postings live in sorted, memory-mapped .npy segments plus a small
+in-memory delta for recently stored games, so lookups are a binary search.
+"""
+
+import hashlib
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import chess
+import chess.polyglot
+import numpy as np
+
+from openings import OPENINGS, identify_opening
+
+POSTING_DTYPE = np.dtype([('key', '<u8'), ('game', '<u4'), ('ply', '<u2')])
+
+KINDS = ('zobrist', 'material', 'eco')
+
+# Piece letters in signature order, e.g. "KRPvKR"
+_SIGNATURE_ORDER = (chess.KING, chess.QUEEN, chess.ROOK, chess.BISHOP, chess.KNIGHT, chess.PAWN)
+
+# SAN is only needed for as long as an opening line can still match
+_LONGEST_OPENING = max(len(opening["moves"]) for opening in OPENINGS)
+
+
+def material_signature(board):
+    """Material signature of a position, White first (e.g. 'KRPvKR')."""
+    sides = []
+    for color in (chess.WHITE, chess.BLACK):
+        sides.append(''.join(
+            chess.piece_symbol(piece_type).upper() * len(board.pieces(piece_type, color))
+            for piece_type in _SIGNATURE_ORDER
+        ))
+    return 'v'.join(sides)
+
+def normalize_signature(signature):
+    """Canonical form of a typed material signature ('krpvkr', 'KPRvKR' -> 'KRPvKR')."""
+    order = ''.join(chess.piece_symbol(piece_type).upper() for piece_type in _SIGNATURE_ORDER)
+    sides = signature.strip().upper().split('V')
+    return 'v'.join(''.join(sorted(side, key=lambda c: order.find(c))) for side in sides)
+
+def text_key(text):
+    """64-bit key for a text value (material signature or ECO code)."""
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), 'little')
+
+def game_postings(moves):
+    """
+    Compute the index postings for one stored game.
+
+    Every ply gets a Zobrist posting; material signatures are only posted at
+    the ply where they first arise, and the ECO code at the ply where the
+    opening line was completed.
+
+    Args:
+        moves (list): Stored move list - dicts with 'move' (SAN) and 'fen' (FEN before the move)
+
+    Returns:
+        dict: kind -> list of (key, ply)
+    """
+    start_fen = moves[0]['fen'] if moves and moves[0].get('fen') else chess.STARTING_FEN
+    board = chess.Board(start_fen)
+    postings = {kind: [] for kind in KINDS}
+    seen_signatures = set()
+    san_sequence = []
+
+    def post_position(ply):
+        postings['zobrist'].append((chess.polyglot.zobrist_hash(board), ply))
+        signature = material_signature(board)
+        if signature not in seen_signatures:
+            seen_signatures.add(signature)
+            postings['material'].append((text_key(signature), ply))
+
+    post_position(0)
+    for ply, move_data in enumerate(moves, start=1):
+        move = board.parse_san(move_data['move'])
+        if ply <= _LONGEST_OPENING:
+            san_sequence.append(board.san(move))
+        board.push(move)
+        post_position(ply)
+
+    if start_fen == chess.STARTING_FEN:
+        opening = identify_opening(san_sequence)
+        if opening:
+            postings['eco'].append((text_key(opening['eco']), len(opening['moves'])))
+    return postings
+
+
+class PositionIndex:
+    """Inverted index from position features to (game_id, ply) postings."""
+
+    def __init__(self, directory: Optional[str] = None, compact_every: int = 100000):
+        """
+        Args:
+            directory: Directory holding the segment files (None keeps the index in memory)
+            compact_every: Number of delta postings that triggers a merge into the segments
+        """
+        self.directory = directory
+        self.compact_every = compact_every
+        self._lock = threading.Lock()
+        self._game_ids: List[str] = []
+        self._persisted_games = 0
+        self._segments = {kind: np.empty(0, dtype=POSTING_DTYPE) for kind in KINDS}
+        self._delta: Dict[str, Dict[int, List[Tuple[int, int]]]] = {kind: {} for kind in KINDS}
+        self._delta_size = 0
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def load(self):
+        """Memory-map the persisted segments."""
+        if not self.directory or not os.path.exists(self._path('games.txt')):
+            return
+        with open(self._path('games.txt'), encoding='utf-8') as f:
+            game_ids = f.read().split()
+        with self._lock:
+            self._game_ids = game_ids
+            self._persisted_games = len(game_ids)
+            for kind in KINDS:
+                path = self._path(f'{kind}.npy')
+                if os.path.exists(path):
+                    self._segments[kind] = np.load(path, mmap_mode='r')
+
+    def add_game(self, game_id, moves):
+        """Index a stored game."""
+        postings = game_postings(moves)
+        with self._lock:
+            game_index = len(self._game_ids)
+            self._game_ids.append(game_id)
+            for kind, entries in postings.items():
+                delta = self._delta[kind]
+                for key, ply in entries:
+                    delta.setdefault(key, []).append((game_index, ply))
+                self._delta_size += len(entries)
+            if self._delta_size >= self.compact_every:
+                self._compact_locked()
+
+    def compact(self):
+        """Merge the in-memory delta into the sorted segments (and persist them)."""
+        with self._lock:
+            self._compact_locked()
+
+    def _compact_locked(self):
+        for kind in KINDS:
+            delta = self._delta[kind]
+            rows = [(key, game, ply) for key, entries in delta.items() for game, ply in entries]
+            merged = np.concatenate([np.asarray(self._segments[kind]), np.array(rows, dtype=POSTING_DTYPE)])
+            merged = merged[np.argsort(merged['key'], kind='stable')]
+            if self.directory:
+                os.makedirs(self.directory, exist_ok=True)
+                tmp_path = self._path(f'{kind}.npy.tmp')
+                with open(tmp_path, 'wb') as f:
+                    np.save(f, merged)
+                os.replace(tmp_path, self._path(f'{kind}.npy'))
+                merged = np.load(self._path(f'{kind}.npy'), mmap_mode='r')
+            self._segments[kind] = merged
+            self._delta[kind] = {}
+        self._delta_size = 0
+
+        if self.directory and len(self._game_ids) > self._persisted_games:
+            with open(self._path('games.txt'), 'a', encoding='utf-8') as f:
+                f.writelines(game_id + '\n' for game_id in self._game_ids[self._persisted_games:])
+            self._persisted_games = len(self._game_ids)
+
+    def search(self, kind, key, limit=100):
+        """
+        Look up postings for a key.
+
+        Returns:
+            tuple: (total number of postings, list of {'game_id', 'ply'} up to limit)
+        """
+        with self._lock:
+            segment = self._segments[kind]
+            keys = segment['key']
+            lo = int(np.searchsorted(keys, key, side='left'))
+            hi = int(np.searchsorted(keys, key, side='right'))
+            found = [(int(game), int(ply)) for game, ply in zip(segment['game'][lo:min(hi, lo + limit)],
+                                                                segment['ply'][lo:min(hi, lo + limit)])]
+            delta = self._delta[kind].get(key, [])
+            found.extend(delta[:max(0, limit - len(found))])
+            results = [{'game_id': self._game_ids[game], 'ply': ply} for game, ply in found]
+            return (hi - lo) + len(delta), results
+
+    def search_fen(self, fen, limit=100):
+        return self.search('zobrist', chess.polyglot.zobrist_hash(chess.Board(fen)), limit)
+
+    def search_material(self, signature, limit=100):
+        return self.search('material', text_key(normalize_signature(signature)), limit)
+
+    def search_eco(self, eco, limit=100):
+        return self.search('eco', text_key(eco.upper()), limit)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'games': len(self._game_ids),
+                'postings': {kind: len(self._segments[kind]) for kind in KINDS},
+                'delta_postings': self._delta_size
+            }
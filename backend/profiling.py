@@ -0,0 +1,195 @@
+"""
+On-demand request profiling.
+A request is profiled when an admin asks for it (X-Profile header or ?profile=1,
+with the admin token) or when it is sampled. Handlers decorated with
+@profiled run under cProfile in the request's thread, engine calls are
+recorded as timed spans, and the finished report (spans plus the hottest
+functions) is kept in memory for retrieval.
+"""
+
+import collections
+import contextlib
+import contextvars
+import cProfile
+import functools
+import io
+import itertools
+import pstats
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+_current: contextvars.ContextVar = contextvars.ContextVar('request_profile', default=None)
+
+# Only one cProfile profiler can run at a time; concurrent profiled requests get spans only
+_cprofile_lock = threading.Lock()
+
+
+class RequestProfile:
+    """Spans and cProfile statistics collected for one request."""
+
+    def __init__(self, profile_id, method, path, reason):
+        self.id = profile_id
+        self.method = method
+        self.path = path
+        self.reason = reason
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.spans: List[Dict] = []
+        self.profiler: Optional[cProfile.Profile] = None
+        self.cprofile_skipped = False
+        self._depth = 0
+
+    def add_span(self, name, start, end, **attrs):
+        self.spans.append({
+            'name': name,
+            'start_ms': round((start - self.started) * 1000, 3),
+            'duration_ms': round((end - start) * 1000, 3),
+            **attrs
+        })
+
+    def report(self, duration_ms, top=30) -> Dict:
+        functions = []
+        if self.profiler is not None:
+            stats = pstats.Stats(self.profiler, stream=io.StringIO())
+            rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:top]
+            for (filename, line, name), (calls, _, tottime, cumtime, _) in rows:
+                functions.append({
+                    'function': f"{filename}:{line}({name})",
+                    'calls': calls,
+                    'tottime_ms': round(tottime * 1000, 3),
+                    'cumtime_ms': round(cumtime * 1000, 3)
+                })
+        handler_ms = sum(span['duration_ms'] for span in self.spans if span.get('handler'))
+        return {
+            'id': self.id,
+            'method': self.method,
+            'path': self.path,
+            'reason': self.reason,
+            'started_at': self.started_at,
+            'duration_ms': round(duration_ms, 3),
+            # Time outside the profiled handlers: routing, dependencies, JSON serialization
+            'outside_handlers_ms': round(max(0.0, duration_ms - handler_ms), 3),
+            'engine_ms': round(sum(span['duration_ms'] for span in self.spans
+                                   if span['name'].startswith('engine.')), 3),
+            'spans': self.spans,
+            'cprofile': 'skipped: another request was being profiled' if self.cprofile_skipped else 'ok',
+            'functions': functions
+        }
+
+
+class Profiler:
+    """Decides which requests to profile and keeps their reports."""
+
+    def __init__(self, admin_token: Optional[str] = None, sample_rate: float = 0.0, max_reports: int = 50):
+        """
+        Args:
+            admin_token: Token required to request a profile and to read reports (None disables both)
+            sample_rate: Fraction of requests profiled without being asked (0 = none)
+            max_reports: Reports kept; the oldest are dropped
+        """
+        self.admin_token = admin_token
+        self.sample_rate = sample_rate
+        self._reports: "collections.OrderedDict[str, Dict]" = collections.OrderedDict()
+        self._max_reports = max_reports
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def is_admin(self, token) -> bool:
+        return bool(self.admin_token) and token == self.admin_token
+
+    def should_profile(self, requested: bool, token) -> Optional[str]:
+        """Reason to profile a request ('requested' or 'sampled'), or None."""
+        if requested and self.is_admin(token):
+            return 'requested'
+        if self.sample_rate and random.random() < self.sample_rate:
+            return 'sampled'
+        return None
+
+    @contextlib.contextmanager
+    def request(self, method, path, reason):
+        """Profile the code run for a request (in this context and the threads it hands off to)."""
+        profile = RequestProfile(f"{int(time.time())}-{next(self._ids)}", method, path, reason)
+        token = _current.set(profile)
+        try:
+            yield profile
+        finally:
+            _current.reset(token)
+            report = profile.report((time.perf_counter() - profile.started) * 1000)
+            with self._lock:
+                self._reports[profile.id] = report
+                while len(self._reports) > self._max_reports:
+                    self._reports.popitem(last=False)
+
+    def reports(self) -> List[Dict]:
+        with self._lock:
+            return [{key: report[key] for key in ('id', 'method', 'path', 'reason', 'started_at',
+                                                  'duration_ms', 'engine_ms')}
+                    for report in reversed(self._reports.values())]
+
+    def get(self, profile_id) -> Optional[Dict]:
+        with self._lock:
+            return self._reports.get(profile_id)
+
+
+@contextlib.contextmanager
+def span(name, **attrs):
+    """Time a block as a span of the current request's profile (no-op when not profiling)."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_span(name, start, time.perf_counter(), **attrs)
+
+
+def profiled(func):
+    """Run a handler under cProfile when the current request is being profiled."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profile = _current.get()
+        if profile is None:
+            return func(*args, **kwargs)
+        outermost = profile._depth == 0
+        profile._depth += 1
+        started_profiler = False
+        if outermost and profile.profiler is None:
+            if _cprofile_lock.acquire(blocking=False):
+                profile.profiler = cProfile.Profile()
+                profile.profiler.enable()
+                started_profiler = True
+            else:
+                profile.cprofile_skipped = True
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if started_profiler:
+                profile.profiler.disable()
+                _cprofile_lock.release()
+            profile._depth -= 1
+            profile.add_span(func.__name__, start, time.perf_counter(), handler=outermost)
+    return wrapper
+
+
+class TracedEngine:
+    """Engine handle that records every analyse()/play() as a span of the profiled request."""
+
+    def __init__(self, engine, name):
+        self.engine = engine
+        self.name = name
+
+    def analyse(self, board, limit, **kwargs):
+        with span('engine.analyse', engine=self.name, limit=str(limit)):
+            return self.engine.analyse(board, limit, **kwargs)
+
+    def play(self, board, limit, **kwargs):
+        with span('engine.play', engine=self.name, limit=str(limit)):
+            return self.engine.play(board, limit, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.engine, name)
@@ -0,0 +1,246 @@
+"""
+Puzzle mining pipeline.
+Scans stored and imported games in parallel for mistakes and blunders whose
+refutation is a single clearly best move, verifies each candidate with a deeper
+multi-PV search and writes a puzzle set (JSON lines) deduplicated by the
+Zobrist hash of the puzzle position. A checkpoint of finished games makes
+interrupted runs resumable.
+"""
+
+import argparse
+import concurrent.futures
+import gzip
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import chess
+import chess.engine
+import chess.pgn
+import chess.polyglot
+
+from engine_workers import init_worker_engines, worker_engine
+from game_review import analyze_game
+
+PUZZLE_CLASSIFICATIONS = ('mistake', 'blunder')
+
+# A game to mine: (key, moves in the stored-game format, result, per-ply review or None)
+GameTask = Tuple[str, List[Dict], Optional[str], Optional[List[Dict]]]
+
+
+def iter_pgn_games(path) -> Iterator[GameTask]:
+    """Games of a PGN file, keyed by file name and game number."""
+    with open(path, encoding='utf-8', errors='replace') as f:
+        number = 0
+        while True:
+            game = chess.pgn.read_game(f)
+            if game is None:
+                return
+            number += 1
+            board = game.board()
+            moves = []
+            for move in game.mainline_moves():
+                moves.append({'move': board.san(move), 'fen': board.fen()})
+                board.push(move)
+            yield f"{os.path.basename(path)}#{number}", moves, game.headers.get("Result"), None
+
+
+def iter_stored_games(path) -> Iterator[GameTask]:
+    """
+    Games from a stored-games snapshot (ANALYSIS_DIR/snapshot/stored_games.json.gz)
+    or a JSON list of [game_id, game_data]. Reviews of ready games are reused.
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        games = json.load(f)
+    for game_id, game_data in games:
+        analysis = game_data.get('analysis') if game_data.get('status') == 'ready' else None
+        yield game_id, game_data.get('moves', []), game_data.get('result'), analysis and analysis['plies']
+
+
+def mine_game(moves: List[Dict], plies: Optional[List[Dict]], review_depth: int, verify_depth: int,
+              min_margin: int, min_advantage: int, solution_plies: int) -> Dict:
+    """
+    Find puzzles in one game (runs in a worker process).
+
+    Every mistake or blunder is a candidate: the puzzle is the position after it,
+    where the opponent must find the refutation. A deeper two-line search
+    keeps the candidate only if the best move wins at least min_advantage and
+    beats the second best move by min_margin centipawns.
+
+    Returns:
+        dict: {'puzzles': [...], 'candidates': int, 'verified': int}
+    """
+    engine = worker_engine({})
+    if plies is None:
+        plies = analyze_game(moves, engine, chess.engine.Limit(depth=review_depth))['plies'] if moves else []
+
+    puzzles = []
+    candidates = verified = 0
+    for ply in plies:
+        if ply['classification'] not in PUZZLE_CLASSIFICATIONS:
+            continue
+        candidates += 1
+        board = chess.Board(ply['fen'])
+        board.push_san(ply['move'])
+        if board.is_game_over() or board.legal_moves.count() < 2:
+            continue
+        lines = engine.analyse(board, chess.engine.Limit(depth=verify_depth), multipv=2)
+        verified += 1
+        if len(lines) < 2:
+            continue
+        best = lines[0]['score'].relative.score(mate_score=10000)
+        second = lines[1]['score'].relative.score(mate_score=10000)
+        if best < min_advantage or best - second < min_margin:
+            continue
+        solution = lines[0]['pv'][:solution_plies]
+        puzzles.append({
+            'id': f"{chess.polyglot.zobrist_hash(board):016x}",
+            'fen': board.fen(),
+            'solution': [move.uci() for move in solution],
+            'solution_san': board.variation_san(solution),
+            'eval': best,
+            'margin': best - second,
+            'mistake': ply['move'],
+            'classification': ply['classification'],
+            'cpl': ply['cpl'],
+            'ply': ply['ply']
+        })
+    return {'puzzles': puzzles, 'candidates': candidates, 'verified': verified}
+
+
+class PuzzleMiner:
+    """Runs mine_game over a stream of games and owns the output, dedup set and checkpoint."""
+
+    def __init__(self, output_path: str, checkpoint_path: Optional[str] = None, checkpoint_every: int = 50):
+        """
+        Args:
+            output_path: Puzzle set (JSON lines); existing puzzles are kept and deduplicated against
+            checkpoint_path: Keys of finished games (default: output_path + '.checkpoint')
+            checkpoint_every: Games between checkpoint writes
+        """
+        self.output_path = output_path
+        self.checkpoint_path = checkpoint_path or output_path + '.checkpoint'
+        self.checkpoint_every = checkpoint_every
+        self.seen: Set[str] = set()
+        self.done: Set[str] = set()
+        self.counters = {'games': 0, 'skipped': 0, 'failed': 0, 'candidates': 0, 'verified': 0,
+                         'puzzles': 0, 'duplicates': 0}
+
+    def load(self):
+        """Resume: read existing puzzles (for deduplication) and the finished-game checkpoint."""
+        if os.path.exists(self.output_path):
+            with open(self.output_path, encoding='utf-8') as f:
+                self.seen = {json.loads(line)['id'] for line in f if line.strip()}
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, encoding='utf-8') as f:
+                self.done = set(json.load(f)['done'])
+
+    def checkpoint(self):
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'done': sorted(self.done)}, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _record(self, key, result, out):
+        self.counters['candidates'] += result['candidates']
+        self.counters['verified'] += result['verified']
+        for puzzle in result['puzzles']:
+            if puzzle['id'] in self.seen:
+                self.counters['duplicates'] += 1
+                continue
+            self.seen.add(puzzle['id'])
+            out.write(json.dumps(dict(puzzle, game=key)) + '\n')
+            self.counters['puzzles'] += 1
+        out.flush()  # Puzzles are on disk before their game is checkpointed
+        self.done.add(key)
+        self.counters['games'] += 1
+        if self.counters['games'] % self.checkpoint_every == 0:
+            self.checkpoint()
+
+    def run(self, games: Iterator[GameTask], workers: int, engine_path: str, review_depth: int = 10,
+            verify_depth: int = 18, min_margin: int = 200, min_advantage: int = 150, solution_plies: int = 5,
+            report_every: int = 100) -> Dict:
+        """
+        Mine games on a process pool (at most a few games per worker in flight).
+
+        Returns:
+            dict: Counters plus elapsed seconds and games per minute
+        """
+        started = time.monotonic()
+        options = (review_depth, verify_depth, min_margin, min_advantage, solution_plies)
+        in_flight: Dict[concurrent.futures.Future, str] = {}
+        with open(self.output_path, 'a', encoding='utf-8') as out, \
+                concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=init_worker_engines,
+                                                       initargs=(engine_path,)) as pool:
+            def collect(return_when):
+                finished, _ = concurrent.futures.wait(in_flight, return_when=return_when)
+                for future in finished:
+                    key = in_flight.pop(future)
+                    try:
+                        self._record(key, future.result(), out)
+                    except Exception as e:
+                        self.counters['failed'] += 1
+                        print(f"Mining {key} failed: {e}", file=sys.stderr)
+                    if report_every and self.counters['games'] % report_every == 0:
+                        print(self.report(started))
+
+            for key, moves, result, plies in games:
+                if key in self.done:
+                    self.counters['skipped'] += 1
+                    continue
+                in_flight[pool.submit(mine_game, moves, plies, *options)] = key
+                if len(in_flight) >= workers * 4:
+                    collect(concurrent.futures.FIRST_COMPLETED)
+            if in_flight:
+                collect(concurrent.futures.ALL_COMPLETED)
+        self.checkpoint()
+        return self.report(started)
+
+    def report(self, started) -> Dict:
+        seconds = time.monotonic() - started
+        return {
+            **self.counters,
+            'seconds': round(seconds, 1),
+            'games_per_minute': round(self.counters['games'] / seconds * 60, 2) if seconds else 0.0
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mine puzzles from mistakes and blunders in a game archive")
+    parser.add_argument("pgn", nargs="*", help="PGN files (imported or self-play games)")
+    parser.add_argument("--stored-games", action="append", default=[],
+                        help="Stored-games snapshot (ANALYSIS_DIR/snapshot/stored_games.json.gz)")
+    parser.add_argument("--output", default="puzzles.jsonl")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--engine", default=os.environ.get("STOCKFISH_PATH", os.path.join("..", "stockfish", "stockfish")))
+    parser.add_argument("--review-depth", type=int, default=int(os.environ.get("REVIEW_DEPTH", "10")))
+    parser.add_argument("--verify-depth", type=int, default=18)
+    parser.add_argument("--min-margin", type=int, default=200,
+                        help="Centipawns the best move must beat the second best by")
+    parser.add_argument("--min-advantage", type=int, default=150,
+                        help="Centipawns the best move must win for the solver")
+    parser.add_argument("--solution-plies", type=int, default=5)
+    parser.add_argument("--report-every", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    def games():
+        for path in args.stored_games:
+            yield from iter_stored_games(path)
+        for path in args.pgn:
+            yield from iter_pgn_games(path)
+
+    miner = PuzzleMiner(args.output)
+    miner.load()
+    report = miner.run(games(), args.workers, args.engine, review_depth=args.review_depth,
+                       verify_depth=args.verify_depth, min_margin=args.min_margin,
+                       min_advantage=args.min_advantage, solution_plies=args.solution_plies,
+                       report_every=args.report_every)
+    print(report)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Engine self-play game generator.
+Plays engine-vs-engine games at configurable strengths across a process pool
+(one Stockfish per strength per worker process), reviews every ply with the
+game_review pipeline and streams the finished games to sinks: a PGN file, the
+Parquet game statistics and the position index the API server loads.
+Used for load testing and to seed the statistics and explorer features.
+"""
+
+import argparse
+import concurrent.futures
+import datetime
+import os
+import random
+import sys
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+import chess
+import chess.engine
+import chess.pgn
+
+from engine_profiles import strength_options
+from engine_workers import init_worker_engines, worker_engine
+from game_review import MATE_SCORE, analyze_game
+from openings import OPENINGS
+
+# Evaluations within this many of MATE_SCORE are forced mates, not centipawns
+MAX_MATE_MOVES = 1000
+
+def _opening(rng, opening_plies):
+    """Random book line prefix, so games with identical engine settings still differ."""
+    if not opening_plies:
+        return []
+    return rng.choice(OPENINGS)["moves"][:opening_plies]
+
+def play_game(white_elo: Optional[int], black_elo: Optional[int], move_time: float, review_depth: int,
+              max_plies: int = 300, opening_plies: int = 4, seed: Optional[int] = None) -> Dict:
+    """
+    Play and review one game in a worker process.
+
+    Args:
+        white_elo, black_elo: Playing strength of each side (None = full strength)
+        move_time: Seconds per move
+        review_depth: Depth of the per-ply review search (full-strength engine)
+        max_plies: Adjudicate the game as a draw after this many plies
+        opening_plies: Plies taken from a random book line before the engines take over
+        seed: Random seed for the opening choice
+
+    Returns:
+        dict: Game in the stored-game format ('moves', 'result', 'analysis', ...)
+    """
+    rng = random.Random(seed)
+    board = chess.Board()
+    moves = []
+    players = {chess.WHITE: strength_options(white_elo), chess.BLACK: strength_options(black_elo)}
+    limit = chess.engine.Limit(time=move_time)
+
+    for san in _opening(rng, opening_plies):
+        moves.append({'move': san, 'fen': board.fen()})
+        board.push_san(san)
+
+    while not board.is_game_over(claim_draw=True) and len(moves) < max_plies:
+        move = worker_engine(players[board.turn]).play(board, limit).move
+        moves.append({'move': board.san(move), 'fen': board.fen()})
+        board.push(move)
+
+    result = board.result(claim_draw=True)
+    analysis = analyze_game(moves, worker_engine({}), chess.engine.Limit(depth=review_depth))
+    return {
+        'moves': moves,
+        'result': result,
+        'white_elo': white_elo,
+        'black_elo': black_elo,
+        'timestamp': datetime.datetime.now().isoformat(),
+        'source': 'self-play',
+        'status': 'ready',
+        'analysis': analysis
+    }
+
+
+def game_to_pgn(game_id: str, game_data: Dict) -> chess.pgn.Game:
+    """PGN of a reviewed game, with the evaluation and classification of every ply as comments."""
+    game = chess.pgn.Game()
+    game.headers["Event"] = "ChessMentor self-play"
+    game.headers["Date"] = game_data['timestamp'][:10].replace("-", ".")
+    game.headers["White"] = f"Stockfish {game_data['white_elo'] or 'full'}"
+    game.headers["Black"] = f"Stockfish {game_data['black_elo'] or 'full'}"
+    game.headers["Result"] = game_data['result']
+    game.headers["GameId"] = game_id
+    opening = game_data['analysis'].get('opening')
+    if opening:
+        game.headers["ECO"] = opening['eco']
+        game.headers["Opening"] = opening['name']
+
+    node = game
+    for ply in game_data['analysis']['plies']:
+        node = node.add_variation(node.board().parse_san(ply['move']))
+        evaluation = pgn_eval(ply['eval'])
+        node.comment = f"[%eval {evaluation}] {ply['classification']}" if evaluation else ply['classification']
+    return game
+
+def pgn_eval(white_eval: int) -> Optional[str]:
+    """
+    %eval value for a review evaluation (White's view): pawns, or #N / #-N for
+    a forced mate. None once the game is mate, which has no evaluation.
+    """
+    if abs(white_eval) < MATE_SCORE - MAX_MATE_MOVES:
+        return f"{white_eval / 100:.2f}"
+    moves = MATE_SCORE - abs(white_eval)  # See game_review._evaluate (mate_score=MATE_SCORE)
+    if moves == 0:
+        return None
+    return f"#{moves}" if white_eval > 0 else f"#-{moves}"
+
+
+class PgnSink:
+    """Appends finished games to a PGN file."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, game_id, game_data):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            print(game_to_pgn(game_id, game_data), file=f, end="\n\n")
+
+
+def analysis_sinks(analysis_dir: str):
+    """
+    Sinks adding games to the statistics, position index and opening explorer
+    stored in a server's ANALYSIS_DIR.
+
+    Returns:
+        tuple: (sinks, stores) - call every store once the games are done, to persist them
+    """
+    from game_stats import GameStatsStore
+    from opening_explorer import OpeningExplorer
+    from position_index import PositionIndex
+    stats = GameStatsStore(os.path.join(analysis_dir, "game_stats"))
+    index = PositionIndex(os.path.join(analysis_dir, "position_index"))
+    explorer = OpeningExplorer(os.path.join(analysis_dir, "explorer.parquet"))
+    stats.load()
+    index.load()
+    explorer.load()
+    sinks = [
+        stats.add_game,
+        lambda game_id, game_data: index.add_game(game_id, game_data['moves']),
+        explorer.add_game
+    ]
+    return sinks, [stats.flush, index.compact, explorer.flush]
+
+
+def run_self_play(games: int, workers: int, engine_path: str, sinks: List[Callable],
+                  white_elo: Optional[int] = None, black_elo: Optional[int] = None,
+                  move_time: float = 0.05, review_depth: int = 10, max_plies: int = 300,
+                  opening_plies: int = 4, seed: int = 0, report_every: int = 10) -> Dict:
+    """
+    Play games across a process pool and stream each finished game to the sinks.
+
+    Args:
+        games: Number of games
+        workers: Worker processes (each runs its own engines)
+        engine_path: UCI engine executable
+        sinks: Callables (game_id, game_data), called in this process as games finish
+        report_every: Print throughput after this many games (0 = never)
+
+    Returns:
+        dict: {'games', 'failed', 'plies', 'seconds', 'games_per_minute'}
+    """
+    started = time.monotonic()
+    finished = failed = plies = 0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=init_worker_engines,
+                                                initargs=(engine_path,)) as pool:
+        futures = [
+            pool.submit(play_game, white_elo, black_elo, move_time, review_depth,
+                        max_plies, opening_plies, seed + i)
+            for i in range(games)
+        ]
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                game_data = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"Self-play game failed: {e}", file=sys.stderr)
+                continue
+            game_id = str(uuid.uuid4())
+            for sink in sinks:
+                sink(game_id, game_data)
+            finished += 1
+            plies += len(game_data['moves'])
+            if report_every and finished % report_every == 0:
+                elapsed = time.monotonic() - started
+                print(f"{finished}/{games} games, {finished / elapsed * 60:.1f} games/min")
+
+    seconds = time.monotonic() - started
+    return {
+        'games': finished,
+        'failed': failed,
+        'plies': plies,
+        'seconds': round(seconds, 1),
+        'games_per_minute': round(finished / seconds * 60, 2) if seconds else 0.0
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate reviewed engine-vs-engine games")
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--engine", default=os.environ.get("STOCKFISH_PATH", os.path.join("..", "stockfish", "stockfish")))
+    parser.add_argument("--white-elo", type=int, help="White strength (default: full strength)")
+    parser.add_argument("--black-elo", type=int, help="Black strength (default: full strength)")
+    parser.add_argument("--move-time", type=float, default=0.05, help="Seconds per move")
+    parser.add_argument("--review-depth", type=int, default=int(os.environ.get("REVIEW_DEPTH", "10")))
+    parser.add_argument("--max-plies", type=int, default=300)
+    parser.add_argument("--opening-plies", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report-every", type=int, default=10, help="Print throughput every N games")
+    parser.add_argument("--pgn", help="Append games to this PGN file")
+    parser.add_argument("--analysis-dir", help="Add games to the statistics, position index and opening explorer "
+                                               "in this directory "
+                                               "(the server's ANALYSIS_DIR; stop the server first)")
+    args = parser.parse_args(argv)
+
+    sinks, stores = analysis_sinks(args.analysis_dir) if args.analysis_dir else ([], [])
+    if args.pgn:
+        sinks.append(PgnSink(args.pgn))
+
+    try:
+        report = run_self_play(args.games, args.workers, args.engine, sinks,
+                               white_elo=args.white_elo, black_elo=args.black_elo,
+                               move_time=args.move_time, review_depth=args.review_depth,
+                               max_plies=args.max_plies, opening_plies=args.opening_plies, seed=args.seed,
+                               report_every=args.report_every)
+    finally:
+        for close in stores:
+            close()
+    print(report)
+    return report
+
+
+if __name__ == "__main__":
+    main()
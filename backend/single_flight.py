@@ -0,0 +1,129 @@
+"""
+Single-flight engine request coalescing.
+Concurrent requests for the same (position, search) share one engine search:
+the first caller runs it and everyone else waits on the same future. A deeper
+search already in flight also satisfies a shallower request for the position.
+"""
+
+import concurrent.futures
+import dataclasses
+import threading
+from typing import Dict, List
+
+import chess.polyglot
+
+
+class _Flight:
+    """One in-flight engine search."""
+
+    def __init__(self, depth, limit_key, priority):
+        self.depth = depth
+        self.limit_key = limit_key
+        self.priority = priority
+        self.future = concurrent.futures.Future()
+        self.waiters = 0
+
+
+def _limit_key(limit):
+    return dataclasses.astuple(limit)
+
+def position_key(board):
+    """
+    Key for everything the engine is told about a position: its Zobrist hash,
+    the halfmove clock (50-move rule) and the hashes of the earlier positions it
+    could still repeat, i.e. those since the last capture or pawn move.
+    """
+    plies = min(board.halfmove_clock, len(board.move_stack))
+    history = []
+    if plies:
+        earlier = board.copy(stack=plies)
+        for _ in range(plies):
+            earlier.pop()
+            history.append(chess.polyglot.zobrist_hash(earlier))
+    return chess.polyglot.zobrist_hash(board), board.halfmove_clock, tuple(history)
+
+def depth_limit(limit):
+    """Depth of a pure depth limit, or None if the limit uses anything else."""
+    others = [value for field, value in dataclasses.asdict(limit).items() if field != 'depth']
+    if limit.depth is not None and all(value is None for value in others):
+        return limit.depth
+    return None
+
+
+class CoalescingEngine:
+    """
+    Wraps an engine (analyse/play) and coalesces identical concurrent searches.
+
+    Searches are keyed by the position (see position_key: two move orders
+    reaching the same position share a search only if they agree on the 50-move
+    and repetition state), the command and the search limit. Calls with extra keyword arguments (multipv, root_moves, ...)
+    bypass coalescing. A priority argument (see engine_scheduler) is passed
+    through; a caller only joins a search queued at the same or a more urgent
+    priority. Every other attribute is delegated to the wrapped engine.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._lock = threading.Lock()
+        self._flights: Dict[tuple, List[_Flight]] = {}
+        self._counters = {'searches': 0, 'coalesced': 0, 'deeper_hits': 0, 'bypassed': 0}
+
+    def __getattr__(self, name):
+        return getattr(self.engine, name)
+
+    def analyse(self, board, limit, **kwargs):
+        return self._coalesce('analyse', board, limit, kwargs)
+
+    def play(self, board, limit, **kwargs):
+        return self._coalesce('play', board, limit, kwargs)
+
+    def _coalesce(self, method, board, limit, kwargs):
+        priority = kwargs.pop('priority', None)
+        passthrough = {} if priority is None else {'priority': priority}
+        if kwargs:
+            self._counters['bypassed'] += 1
+            return getattr(self.engine, method)(board, limit, **kwargs, **passthrough)
+
+        key = (position_key(board), method)
+        depth = depth_limit(limit)
+        limit_key = _limit_key(limit)
+
+        with self._lock:
+            flights = self._flights.setdefault(key, [])
+            for flight in flights:
+                same = flight.limit_key == limit_key
+                deeper = depth is not None and flight.depth is not None and flight.depth >= depth
+                urgent_enough = priority is None or flight.priority is None or flight.priority <= priority
+                if (same or deeper) and urgent_enough:
+                    flight.waiters += 1
+                    self._counters['coalesced'] += 1
+                    if not same:
+                        self._counters['deeper_hits'] += 1
+                    break
+            else:
+                flight = None
+                own = _Flight(depth, limit_key, priority)
+                flights.append(own)
+                self._counters['searches'] += 1
+
+        if flight is not None:
+            return flight.future.result()
+
+        try:
+            result = getattr(self.engine, method)(board, limit, **passthrough)
+            own.future.set_result(result)
+            return result
+        except BaseException as e:
+            own.future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                flights = self._flights[key]
+                flights.remove(own)
+                if not flights:
+                    del self._flights[key]
+
+    def coalescing_stats(self):
+        with self._lock:
+            in_flight = sum(len(flights) for flights in self._flights.values())
+        return {'in_flight': in_flight, **self._counters}
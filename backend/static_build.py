@@ -0,0 +1,144 @@
+"""
+Static frontend serving for release mode.
+Serves the prebuilt React app (frontend/build) from the FastAPI backend, so no
+Node process is needed in production. Text assets are precompressed by the
+frontend build (`npm run build` runs this module as its postbuild step: gzip,
+and brotli when the brotli package is installed), so startup only indexes the
+build directory. Content-hashed files get long-lived immutable cache headers
+and everything else is revalidated.
+"""
+
+import gzip
+import mimetypes
+import os
+import re
+import sys
+from typing import Dict, Optional
+
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response
+
+try:
+    import brotli
+except ImportError:  # Optional - gzip is always available
+    brotli = None
+
+BUILD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         "..", "stchess", "component_board", "frontend", "build")
+
+COMPRESSIBLE_EXTENSIONS = {'.html', '.js', '.css', '.json', '.map', '.svg', '.txt', '.ico'}
+
+# Create React App puts a content hash in every file under static/, e.g. main.3f2a9c1e.chunk.js
+HASHED_NAME = re.compile(r'\.[0-9a-f]{8,}\.(?:chunk\.)?[a-z0-9]+$')
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+# Preferred order when the client accepts several encodings
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def _compressors():
+    compressors = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        compressors.append(('.br', lambda data: brotli.compress(data, quality=11)))
+    return compressors
+
+def precompress_build(build_dir=BUILD_DIR, min_size=1024):
+    """
+    Write .gz (and .br) siblings for compressible build files that lack an up-to-date one.
+
+    Returns:
+        int: Number of compressed files written
+    """
+    written = 0
+    for root, _, files in os.walk(build_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            if os.path.splitext(name)[1] not in COMPRESSIBLE_EXTENSIONS or os.path.getsize(path) < min_size:
+                continue
+            data = None
+            for suffix, compress in _compressors():
+                target = path + suffix
+                if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+                    continue
+                if data is None:
+                    with open(path, 'rb') as f:
+                        data = f.read()
+                with open(target, 'wb') as out:
+                    out.write(compress(data))
+                written += 1
+    return written
+
+def accepted_encodings(header):
+    """Encodings named in an Accept-Encoding header, excluding ones refused with q=0."""
+    accepted = set()
+    for token in header.split(','):
+        name, _, params = token.strip().partition(';')
+        params = params.replace(' ', '')
+        try:
+            quality = float(params[2:]) if params.startswith('q=') else 1.0
+        except ValueError:
+            quality = 1.0
+        if quality > 0:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+class StaticBuild:
+    """Prebuilt frontend served from an in-memory table of files built at startup."""
+
+    def __init__(self, build_dir=BUILD_DIR):
+        self.build_dir = os.path.abspath(build_dir)
+        self._files: Dict[str, Dict] = {}
+
+    @property
+    def available(self):
+        return os.path.isfile(os.path.join(self.build_dir, 'index.html'))
+
+    def load(self):
+        """Index the build directory and its precompressed siblings."""
+        if not self.available:
+            return
+        files = {}
+        for root, _, names in os.walk(self.build_dir):
+            for name in names:
+                if name.endswith(('.gz', '.br')):
+                    continue
+                path = os.path.join(root, name)
+                relative = os.path.relpath(path, self.build_dir).replace(os.sep, '/')
+                hashed = relative.startswith('static/') and HASHED_NAME.search(name) is not None
+                files[relative] = {
+                    'path': path,
+                    'media_type': mimetypes.guess_type(name)[0] or 'application/octet-stream',
+                    'cache_control': IMMUTABLE_CACHE if hashed else REVALIDATE_CACHE,
+                    'encodings': [(encoding, path + suffix) for encoding, suffix in ENCODINGS
+                                  if os.path.exists(path + suffix)]
+                }
+        self._files = files
+
+    def _lookup(self, path) -> Optional[Dict]:
+        entry = self._files.get(path.lstrip('/') or 'index.html')
+        if entry is None and '.' not in path.rsplit('/', 1)[-1]:
+            # Client-side routes such as /review fall back to the app shell
+            entry = self._files.get('index.html')
+        return entry
+
+    def response(self, request: Request, path: str) -> Response:
+        entry = self._lookup(path)
+        if entry is None:
+            return Response(status_code=404)
+
+        accepted = accepted_encodings(request.headers.get('accept-encoding', ''))
+        headers = {'Cache-Control': entry['cache_control'], 'Vary': 'Accept-Encoding'}
+        for encoding, encoded_path in entry['encodings']:
+            if encoding in accepted:
+                headers['Content-Encoding'] = encoding
+                return FileResponse(encoded_path, media_type=entry['media_type'], headers=headers)
+        return FileResponse(entry['path'], media_type=entry['media_type'], headers=headers)
+
+
+if __name__ == "__main__":
+    # Postbuild step: python static_build.py [build_dir]
+    build_dir = sys.argv[1] if len(sys.argv) > 1 else BUILD_DIR
+    print(f"Precompressed {precompress_build(build_dir)} files in {os.path.abspath(build_dir)}")
@@ -0,0 +1,183 @@
+"""
+Variation tree for the live game.
+Every move played is a node; taking back or jumping to an earlier node keeps
+the moves after it as a branch, so alternatives can be explored without
+losing the main line. Each node keeps the analysis computed for its move and
+for the position it leads to, so revisiting a known node needs no engine work.
+"""
+
+import itertools
+from typing import Dict, List, Optional
+
+import chess
+
+PLAYED_BY_USER = 'user'
+PLAYED_BY_ENGINE = 'engine'
+
+
+class VariationNode:
+    """A move in the tree (the root node has no move and holds the starting position)."""
+
+    def __init__(self, node_id, parent, move, san, fen, played_by):
+        """
+        Args:
+            node_id: Id unique within the tree
+            parent: Parent VariationNode (None for the root)
+            move: chess.Move played from the parent position (None for the root)
+            san: The move in SAN
+            fen: FEN before the move (the position itself for the root)
+            played_by: PLAYED_BY_USER or PLAYED_BY_ENGINE
+        """
+        self.id = node_id
+        self.parent = parent
+        self.move = move
+        self.san = san
+        self.fen = fen
+        self.played_by = played_by
+        self.children: Dict[str, "VariationNode"] = {}  # UCI -> child, in the order first played
+        self.analysis: Optional[Dict] = None  # Review of this move (user moves)
+        self.evaluation: Optional[Dict] = None  # Engine evaluation of the position after this move
+        self.ply = parent.ply + 1 if parent is not None else 0
+
+    def to_dict(self) -> Dict:
+        return {
+            'id': self.id,
+            'parent': self.parent.id if self.parent is not None else None,
+            'ply': self.ply,
+            'move': self.san,
+            'uci': self.move.uci() if self.move else None,
+            'fen': self.fen,
+            'played_by': self.played_by,
+            'children': [child.id for child in self.children.values()],
+            'analysis': self.analysis,
+            'evaluation': self.evaluation
+        }
+
+
+class VariationTree:
+    """All lines explored from one starting position, with a current node."""
+
+    def __init__(self, fen: str = chess.STARTING_FEN):
+        self._ids = itertools.count()
+        self.root = VariationNode(next(self._ids), None, None, None, chess.Board(fen).fen(), None)
+        self.nodes: Dict[int, VariationNode] = {self.root.id: self.root}
+        self.current = self.root
+
+    def path(self, node: Optional[VariationNode] = None) -> List[VariationNode]:
+        """Nodes from the first move down to node (default: the current node)."""
+        node = node or self.current
+        path = []
+        while node.parent is not None:
+            path.append(node)
+            node = node.parent
+        path.reverse()
+        return path
+
+    def board(self) -> chess.Board:
+        """The current position, with the line leading to it on the move stack."""
+        board = chess.Board(self.root.fen)
+        for node in self.path():
+            board.push(node.move)
+        return board
+
+    def child(self, move: chess.Move) -> Optional[VariationNode]:
+        """The node for a move from the current position, if it was played before."""
+        return self.current.children.get(move.uci())
+
+    def user_to_move(self) -> bool:
+        """Whether it is the user's turn: the user moves first from the root and sides alternate."""
+        return self.current.ply % 2 == 0
+
+    def reply(self) -> Optional[VariationNode]:
+        """The engine's earlier reply from the current position, if any."""
+        for node in self.current.children.values():
+            if node.played_by == PLAYED_BY_ENGINE:
+                return node
+        return None
+
+    def play(self, move: chess.Move, played_by: str = PLAYED_BY_USER,
+             board: Optional[chess.Board] = None) -> VariationNode:
+        """
+        Make a move from the current node, reusing the existing node if the move was played before.
+
+        Args:
+            move: Legal move in the current position
+            played_by: PLAYED_BY_USER or PLAYED_BY_ENGINE
+            board: The current position, if the caller already has it
+
+        Returns:
+            VariationNode: The (new or existing) node, which becomes current
+        """
+        node = self.child(move)
+        if node is None:
+            board = board if board is not None else self.board()
+            if not board.is_legal(move):
+                raise ValueError(f"Illegal move {move.uci()} in {board.fen()}")
+            node = VariationNode(next(self._ids), self.current, move, board.san(move), board.fen(), played_by)
+            self.current.children[move.uci()] = node
+            self.nodes[node.id] = node
+        self.current = node
+        return node
+
+    def takeback(self, plies: Optional[int] = None) -> VariationNode:
+        """
+        Step back along the current line; the moves taken back stay in the tree.
+
+        Args:
+            plies: Number of plies to take back (default: back to before the last user move)
+
+        Returns:
+            VariationNode: The new current node
+        """
+        if plies is None:
+            while self.current.parent is not None:
+                played_by = self.current.played_by
+                self.current = self.current.parent
+                if played_by == PLAYED_BY_USER:
+                    break
+        else:
+            for _ in range(plies):
+                if self.current.parent is None:
+                    break
+                self.current = self.current.parent
+        return self.current
+
+    def goto(self, node_id: int) -> VariationNode:
+        """Make a node current. Raises KeyError for an unknown id."""
+        self.current = self.nodes[node_id]
+        return self.current
+
+    def san_line(self) -> List[str]:
+        """SAN moves (both sides) leading to the current node."""
+        return [node.san for node in self.path()]
+
+    def history(self) -> List[Dict]:
+        """The current line as move history entries: the move and the FEN before it."""
+        return [{'move': node.san, 'fen': node.fen} for node in self.path()]
+
+    def to_dict(self) -> Dict:
+        return {
+            'root_fen': self.root.fen,
+            'current': self.current.id,
+            'nodes': [node.to_dict() for node in self.nodes.values()]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "VariationTree":
+        """Rebuild a tree from to_dict() output (node ids are kept)."""
+        tree = cls(data['root_fen'])
+        nodes = data['nodes']
+        tree.root.evaluation = nodes[0]['evaluation']
+        tree.nodes = {nodes[0]['id']: tree.root}
+        tree.root.id = nodes[0]['id']
+        for item in nodes[1:]:  # Parents always come before their children
+            parent = tree.nodes[item['parent']]
+            node = VariationNode(item['id'], parent, chess.Move.from_uci(item['uci']), item['move'],
+                                 item['fen'], item['played_by'])
+            node.analysis = item['analysis']
+            node.evaluation = item['evaluation']
+            parent.children[item['uci']] = node
+            tree.nodes[node.id] = node
+        tree._ids = itertools.count(max(tree.nodes) + 1)
+        tree.current = tree.nodes[data['current']]
+        return tree
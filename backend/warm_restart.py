@@ -0,0 +1,89 @@
+"""
+Warm restart support.
+On graceful shutdown the live session, stored games and hot cache entries are
+written as gzip-compressed JSON snapshot sections. After a restart the server
+accepts traffic immediately; a section is only read back (and removed from
+disk) when a request first touches the state it holds.
+"""
+
+import gzip
+import json
+import os
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict
+
+
+class _Section:
+    def __init__(self, dump, restore):
+        self.dump = dump
+        self.restore = restore
+        self.lock = threading.Lock()
+        self.pending = False  # A snapshot on disk hasn't been restored yet
+        self.restored_ms = None
+
+
+class WarmRestart:
+    """Named snapshot sections with lazy, once-only restore."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._sections: Dict[str, _Section] = {}
+
+    def register(self, name: str, dump: Callable[[], Any], restore: Callable[[Any], None]):
+        """
+        Args:
+            name: Section name (file name of the snapshot)
+            dump: Returns the section's JSON-serializable state at shutdown
+            restore: Receives that state when the section is first needed
+        """
+        section = _Section(dump, restore)
+        section.pending = os.path.exists(self._path(name))
+        self._sections[name] = section
+
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.json.gz")
+
+    def ensure(self, name):
+        """Restore a section if its snapshot hasn't been loaded yet (cheap once restored)."""
+        section = self._sections[name]
+        if not section.pending:
+            return
+        with section.lock:
+            if not section.pending:
+                return
+            started = time.monotonic()
+            path = self._path(name)
+            try:
+                with gzip.open(path, 'rt', encoding='utf-8') as f:
+                    section.restore(json.load(f))
+            except Exception:
+                traceback.print_exc()  # A bad snapshot only costs the warm state
+            os.remove(path)
+            section.restored_ms = round((time.monotonic() - started) * 1000, 1)
+            section.pending = False
+
+    def dependency(self, *names):
+        """FastAPI dependency that restores the given sections before the endpoint runs."""
+        def restore_sections():
+            for name in names:
+                self.ensure(name)
+        return restore_sections
+
+    def save(self):
+        """Write every section. Sections never restored in this run keep their old snapshot."""
+        os.makedirs(self.directory, exist_ok=True)
+        for name, section in self._sections.items():
+            with section.lock:
+                if section.pending:
+                    continue
+                path = self._path(name)
+                tmp_path = path + ".tmp"
+                with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+                    json.dump(section.dump(), f, separators=(',', ':'))
+                os.replace(tmp_path, path)
+
+    def status(self) -> Dict:
+        return {name: {'pending': section.pending, 'restored_ms': section.restored_ms}
+                for name, section in self._sections.items()}
@@ -1,12 +1,11 @@
-import os
 import streamlit.components.v1 as components
-from ..config import DEFAULT_FEN
+from ..config import DEFAULT_FEN, FRONTEND_DEV_URL, FRONTEND_RELEASE_URL, RELEASE
 
-# Create a _RELEASE constant. We'll set this to False while we're developing
-# the component, and True when we're ready to package and distribute it.
-# (This is, of course, optional - there are innumerable ways to manage your
-# release process.)
-_RELEASE = False
+# _RELEASE is False while we're developing the component (served by the
+# `npm start` dev server) and True in production, where the FastAPI backend
+# serves the prebuilt, precompressed frontend/build. Set CHESSMENTOR_RELEASE=1
+# to switch.
+_RELEASE = RELEASE
 
 # Declare a Streamlit component. `declare_component` returns a function
 # that is used to create instances of the component. We're naming this
@@ -28,15 +27,13 @@ if not _RELEASE:
         # Pass `url` here to tell Streamlit that the component will be served
         # by the local dev server that you run via `npm run start`.
         # (This is useful while your component is in development.)
-        url="http://localhost:3000",
+        url=FRONTEND_DEV_URL,
     )
 else:
-    # When we're distributing a production version of the component, we'll
-    # replace the `url` param with `path`, and point it to to the component's
-    # build directory:
-    parent_dir = os.path.dirname(os.path.abspath(__file__))
-    build_dir = os.path.join(parent_dir, "frontend/build")
-    _component_func = components.declare_component("board", path=build_dir)
+    # In production the backend serves the component's build directory
+    # (frontend/build) with compression and cache headers, so no Node process
+    # is needed.
+    _component_func = components.declare_component("board", url=FRONTEND_RELEASE_URL)
 
 
 # Create a wrapper function for the component. This is an optional
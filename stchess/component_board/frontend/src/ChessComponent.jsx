@@ -3,7 +3,9 @@ import Chessboard from "chessboardjsx";
 import "./ChessComponent.css";
 const Chess = require("chess.js");
 
-const API_BASE = "http://127.0.0.1:8000";
+// Same origin as the page: the backend serves the release build, and the dev
+// server proxies API requests to it (see "proxy" in package.json)
+const API_BASE = "";
 
 const ChessComponent = ({ color }) => {
   let startFen = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1";
@@ -413,7 +415,7 @@ const ChessComponent = ({ color }) => {
               };
               
               try {
-                const response = await fetch('http://localhost:8000/store-game', {
+                const response = await fetch(`${API_BASE}/store-game`, {
                   method: 'POST',
                   headers: {
                     'Content-Type': 'application/json',
@@ -421,7 +423,7 @@ const ChessComponent = ({ color }) => {
                   body: JSON.stringify(gameData)
                 });
                 const data = await response.json();
-                window.open(`http://localhost:3000/review?id=${data.game_id}`, '_blank');
+                window.open(`${window.location.origin}/review?id=${data.game_id}`, '_blank');
               } catch (error) {
                 console.error('Error storing game:', error);
               }
@@ -17,7 +17,7 @@ const GameReview = () => {
     
     if (gameId) {
       // Fetch game data from backend using ID
-      fetch(`http://localhost:8000/game/${gameId}`)
+      fetch(`/game/${gameId}`)
         .then(response => response.json())
         .then(data => {
           if (data.error) {
@@ -1 +1,9 @@
+import os
+
 DEFAULT_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+# Release mode: the board component is served prebuilt by the FastAPI backend
+# instead of the `npm start` dev server
+RELEASE = os.environ.get("CHESSMENTOR_RELEASE", "").lower() in ("1", "true", "yes")
+FRONTEND_DEV_URL = os.environ.get("CHESSMENTOR_FRONTEND_DEV_URL", "http://localhost:3000")
+FRONTEND_RELEASE_URL = os.environ.get("CHESSMENTOR_FRONTEND_URL", "http://localhost:8000")
@@ -0,0 +1,23 @@
+"""
+Shared test setup.
+"""
+import importlib
+import os
+import sys
+
+import pytest
+
+# The backend modules use flat imports, so put the backend directory on the path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """The API server module, freshly configured for tmp_path/analysis and without an engine."""
+    monkeypatch.setenv("ANALYSIS_DIR", str(tmp_path / "analysis"))
+    monkeypatch.setenv("STOCKFISH_PATH", str(tmp_path / "no-engine"))
+    monkeypatch.delenv("LLM_MODEL_PATH", raising=False)
+    monkeypatch.delenv("CHESSMENTOR_RELEASE", raising=False)
+    if "fastapi_app" in sys.modules:
+        return importlib.reload(sys.modules["fastapi_app"])
+    return importlib.import_module("fastapi_app")
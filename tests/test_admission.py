@@ -0,0 +1,82 @@
+"""
+Tests for admission control of engine-bound requests.
+"""
+import pytest
+
+from admission import (AdmissionController, AdmissionRejected, WorkClass,
+                       STATE_NORMAL, STATE_OVERLOADED, STATE_SHEDDING)
+from engine_scheduler import PRIORITY_ANALYSIS, PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE
+
+
+class FakeScheduler:
+    """Scheduler stand-in with settable queue depths, running searches and service time."""
+
+    def __init__(self, engines=2, service_ms=100.0):
+        self.engines = [object()] * engines
+        self.queued = {PRIORITY_INTERACTIVE: 0, PRIORITY_ANALYSIS: 0, PRIORITY_BACKGROUND: 0}
+        self.running = dict(self.queued)
+        self.service_ms = service_ms
+
+    def queue_depths(self):
+        return dict(self.queued)
+
+    def running_counts(self):
+        return dict(self.running)
+
+    def service_time_ms(self):
+        return self.service_ms
+
+
+def make_controller(scheduler):
+    return AdmissionController(scheduler, None, {
+        "move": WorkClass(PRIORITY_INTERACTIVE, searches=5, essential=True, budget_ms=300),
+        "analyze": WorkClass(PRIORITY_ANALYSIS, searches=2, essential=False, budget_ms=100),
+    })
+
+
+class TestAdmission:
+    """Test cases for wait estimates and shedding."""
+
+    def test_idle_engines_admit_immediately(self):
+        controller = make_controller(FakeScheduler())
+        assert controller.estimated_wait_ms("analyze") == 0.0
+        with controller.admit("analyze"):
+            assert controller.status()['classes']['analyze']['in_flight'] == 1
+        assert controller.status()['classes']['analyze']['admitted'] == 1
+        assert controller.state() == STATE_NORMAL
+
+    def test_running_background_searches_count_towards_the_wait(self):
+        scheduler = FakeScheduler()
+        controller = make_controller(scheduler)
+        scheduler.running[PRIORITY_BACKGROUND] = 1
+        assert controller.estimated_wait_ms("move") == 0.0  # One engine is still free
+        scheduler.running[PRIORITY_BACKGROUND] = 2
+        assert controller.estimated_wait_ms("move") == 50.0  # Half a search until an engine frees up
+        scheduler.queued[PRIORITY_ANALYSIS] = 3
+        assert controller.estimated_wait_ms("analyze") == 200.0
+        assert controller.estimated_wait_ms("move") == 50.0  # Queued analysis doesn't delay moves
+
+    def test_in_flight_requests_count_their_remaining_searches(self):
+        scheduler = FakeScheduler()
+        controller = make_controller(scheduler)
+        with controller.admit("move"):
+            assert controller.estimated_wait_ms("move") == 200.0  # 5 searches on 2 engines
+            scheduler.running[PRIORITY_INTERACTIVE] = 1
+            assert controller.estimated_wait_ms("move") == 200.0  # One of them is now running
+
+    def test_optional_work_is_shed_first(self):
+        scheduler = FakeScheduler()
+        controller = make_controller(scheduler)
+        scheduler.queued[PRIORITY_ANALYSIS] = 4
+        with pytest.raises(AdmissionRejected) as rejected:
+            controller.check("analyze")
+        assert rejected.value.retry_after == 1
+        assert rejected.value.estimated_wait_ms == 150.0
+        controller.check("move")
+        assert controller.state() == STATE_SHEDDING
+
+        scheduler.queued[PRIORITY_INTERACTIVE] = 10
+        with pytest.raises(AdmissionRejected):
+            controller.check("move")
+        assert controller.state() == STATE_OVERLOADED
+        assert controller.status()['classes']['move']['rejected'] == 1
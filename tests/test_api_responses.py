@@ -0,0 +1,75 @@
+"""
+Tests for response models, compression and the pre-serialized game cache.
+"""
+import pytest
+import gzip
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api_responses import (CompressionMiddleware, HistoryResponse, PreserializedCache, choose_encoding,
+                           parse_stored_game)
+
+
+def make_app():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, min_size=100)
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/history", response_model=HistoryResponse)
+    def history():
+        moves = [{"move": "e4", "fen": "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"}] * 20
+        return {"moves": moves, "total_moves": len(moves), "dropped": "not in the model"}
+
+    return app
+
+
+class TestApiResponses:
+    """Test cases for compression, the game body cache and stored game checks."""
+
+    def test_choose_encoding_respects_refusals(self):
+        assert choose_encoding("gzip, deflate") == "gzip"
+        assert choose_encoding("gzip;q=0") is None
+        assert choose_encoding("") is None
+
+
+    def test_large_responses_are_compressed(self):
+        client = TestClient(make_app())
+        response = client.get("/history", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert response.json()["total_moves"] == 20
+        assert "dropped" not in response.json()
+
+        assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+        assert "content-encoding" not in client.get("/history", headers={"Accept-Encoding": "identity"}).headers
+
+
+    def test_cache_reencodes_when_status_changes(self):
+        cache = PreserializedCache(max_entries=2, min_size=10)
+        game = {"status": "ready", "moves": [{"move": "e4"}] * 10}
+        response = cache.response("g1", game, "gzip")
+        assert response.headers["content-encoding"] == "gzip"
+        assert json.loads(gzip.decompress(response.body)) == game
+        assert json.loads(cache.response("g1", game).body) == game
+        assert cache.stats() == {"entries": 1, "hits": 1, "misses": 1}
+
+        game["status"] = "failed"
+        assert json.loads(cache.response("g1", game).body)["status"] == "failed"
+        assert cache.stats()["misses"] == 2
+
+        cache.response("g2", {"status": "ready"})
+        cache.response("g3", {"status": "ready"})
+        assert cache.stats()["entries"] == 2
+
+    def test_stored_games_are_checked_on_input(self):
+        game = {"moves": [{"move": "e4", "fen": "start"}], "result": "*", "fen": "extra field"}
+        assert parse_stored_game(game) is game
+        assert parse_stored_game({}) == {}
+        for payload in ([], "game", {"moves": "e4"}, {"moves": ["e4"]}, {"result": 1}):
+            with pytest.raises(ValueError):
+                parse_stored_game(payload)
@@ -0,0 +1,86 @@
+"""
+Tests for engine pools partitioned by option profile.
+"""
+import chess
+import chess.engine
+import threading
+import time
+
+from engine_profiles import EngineProfile, ProfilePool, strength_options
+
+
+class ProfileEngine:
+    """Engine stand-in that remembers its options and can hold searches."""
+
+    def __init__(self, name, options):
+        self.name = name
+        self.options = options
+        self.release = threading.Event()
+        self.release.set()
+        self.quit_called = False
+
+    def analyse(self, board, limit):
+        self.release.wait(5)
+        return {"engine": self.name, "options": self.options}
+
+    def status(self):
+        return {"name": self.name}
+
+    def quit(self):
+        self.quit_called = True
+
+
+def make_pool(**kwargs):
+    created = []
+
+    def factory(name, options):
+        engine = ProfileEngine(name, options)
+        created.append(engine)
+        return engine
+
+    pool = ProfilePool([
+        EngineProfile("reviewer-full", min_engines=1, max_engines=2),
+        EngineProfile("opponent-1350", strength_options(1350)),
+    ], factory, scale_interval=3600, **kwargs)
+    return pool, created
+
+
+def test_searches_go_to_their_profile_engines():
+    pool, created = make_pool()
+    pool.start()
+    try:
+        reviewer = pool.engine().analyse(chess.Board(), chess.engine.Limit(depth=1))
+        opponent = pool.engine("opponent-1350").analyse(chess.Board(), chess.engine.Limit(depth=1))
+    finally:
+        pool.quit()
+    assert reviewer == {"engine": "reviewer-full-0", "options": {}}
+    assert opponent["options"] == {"UCI_LimitStrength": True, "UCI_Elo": 1350}
+    assert all(engine.quit_called for engine in created)
+
+
+def test_scales_up_under_load_and_down_when_idle():
+    pool, created = make_pool(idle_before_scale_down=10)
+    pool.start()
+    scheduler = pool.schedulers["reviewer-full"]
+    try:
+        created[0].release.clear()
+        futures = [scheduler.submit('analyse', chess.Board(), chess.engine.Limit(depth=d)) for d in (1, 2)]
+        deadline = time.monotonic() + 5
+        while sum(scheduler.queue_depths().values()) != 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert pool.scale("reviewer-full") == 1
+        assert pool.scale("reviewer-full") == 0  # Already at max_engines
+        assert futures[1].result(5)["engine"] == "reviewer-full-1"
+        created[0].release.set()
+        futures[0].result(5)
+
+        now = time.monotonic()
+        assert pool.scale("reviewer-full", now=now) == 0  # Quiet period starts
+        assert pool.scale("reviewer-full", now=now + 11) == -1
+        deadline = time.monotonic() + 5
+        while len(scheduler.engines) != 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert [engine.status()["name"] for engine in scheduler.engines] == ["reviewer-full-0"]
+        assert pool.status()["profiles"]["reviewer-full"]["scaled_down"] == 1
+    finally:
+        pool.quit()
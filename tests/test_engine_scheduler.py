@@ -0,0 +1,125 @@
+"""
+Tests for the priority engine scheduler.
+"""
+import pytest
+import chess
+import chess.engine
+import threading
+import time
+
+from engine_scheduler import (EngineScheduler, PRIORITY_INTERACTIVE, PRIORITY_ANALYSIS,
+                              PRIORITY_BACKGROUND)
+
+
+class RecordingEngine:
+    """Engine stand-in that records searches and can be held at the first one."""
+
+    def __init__(self):
+        self.searches = []
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def analyse(self, board, limit):
+        self.searches.append(limit.depth)
+        self.started.set()
+        self.release.wait(5)
+        return {"depth": limit.depth}
+
+    def status(self):
+        return {}
+
+    def quit(self):
+        pass
+
+
+class GatedEngine(RecordingEngine):
+    """Engine stand-in whose searches each wait for one gate release."""
+
+    def __init__(self):
+        super().__init__()
+        self.gate = threading.Semaphore(0)
+
+    def analyse(self, board, limit):
+        self.searches.append(limit.depth)
+        self.gate.acquire(timeout=5)
+        return {"depth": limit.depth}
+
+
+def wait_until(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+class TestEngineScheduler:
+    """Test cases for priority ordering and time-slicing."""
+
+    def test_interactive_work_runs_before_queued_background_work(self):
+        engine = RecordingEngine()
+        scheduler = EngineScheduler([engine]).start()
+        try:
+            blocker = scheduler.submit('analyse', chess.Board(), chess.engine.Limit(depth=1), PRIORITY_ANALYSIS)
+            engine.started.wait(5)
+            background = scheduler.submit('analyse', chess.Board(), chess.engine.Limit(depth=2), PRIORITY_BACKGROUND)
+            interactive = scheduler.submit('analyse', chess.Board(), chess.engine.Limit(depth=3), PRIORITY_INTERACTIVE)
+            engine.release.set()
+            for future in (blocker, background, interactive):
+                future.result(5)
+        finally:
+            scheduler.quit()
+
+        assert engine.searches == [1, 3, 2]
+
+    def test_deep_background_search_is_sliced(self):
+        engine = RecordingEngine()
+        engine.release.set()
+        scheduler = EngineScheduler([engine], slice_depth=4, slice_step=3).start()
+        try:
+            result = scheduler.analyse(chess.Board(), chess.engine.Limit(depth=12), priority=PRIORITY_BACKGROUND)
+        finally:
+            scheduler.quit()
+
+        assert engine.searches == [4, 7, 10, 12]
+        assert result == {"depth": 12}
+        assert scheduler.status()['classes']['background']['slices'] == 3
+
+    def test_slices_stay_on_the_engine_that_started_the_job(self):
+        engines = [GatedEngine(), GatedEngine()]
+        scheduler = EngineScheduler(engines, class_limits={PRIORITY_BACKGROUND: 2},
+                                    slice_depth=4, slice_step=4).start()
+        try:
+            job = scheduler.submit('analyse', chess.Board(), chess.engine.Limit(depth=8), PRIORITY_BACKGROUND)
+            wait_until(lambda: any(engine.searches for engine in engines))
+            owner, other = engines if engines[0].searches else reversed(engines)
+            first = scheduler.submit('analyse', chess.Board(), chess.engine.Limit(depth=1), PRIORITY_INTERACTIVE)
+            wait_until(lambda: other.searches == [1])
+            scheduler.submit('analyse', chess.Board(), chess.engine.Limit(depth=2), PRIORITY_INTERACTIVE)
+
+            owner.gate.release()  # First slice done; the owner moves on to the queued interactive search
+            wait_until(lambda: owner.searches == [4, 2])
+            other.gate.release()
+            first.result(5)
+            time.sleep(0.05)
+            assert other.searches == [1]  # The idle engine leaves the second slice to its owner
+
+            owner.gate.release()
+            wait_until(lambda: owner.searches == [4, 2, 8])
+            owner.gate.release()
+            assert job.result(5) == {"depth": 8}
+        finally:
+            for engine in engines:
+                engine.gate.release(10)
+            scheduler.quit()
+
+    def test_errors_are_returned_to_the_caller(self):
+        class BrokenEngine(RecordingEngine):
+            def analyse(self, board, limit):
+                raise chess.engine.EngineError("boom")
+
+        scheduler = EngineScheduler([BrokenEngine()]).start()
+        try:
+            with pytest.raises(chess.engine.EngineError):
+                scheduler.analyse(chess.Board(), chess.engine.Limit(depth=1))
+        finally:
+            scheduler.quit()
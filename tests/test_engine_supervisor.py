@@ -0,0 +1,132 @@
+"""
+Tests for the engine supervisor.
+"""
+import pytest
+import chess
+import chess.engine
+import threading
+
+from engine_supervisor import EngineSupervisor, EngineUnavailableError, STATE_READY, STATE_DEAD
+
+
+class FakeEngine:
+    """Engine stand-in that can be told to hang or crash on its next search."""
+
+    behaviour = []  # Shared queue of behaviours for the next searches: 'ok', 'hang', 'crash'
+
+    def __init__(self):
+        self.closed = threading.Event()
+        self.configured = {}
+
+    def configure(self, options):
+        self.configured.update(options)
+
+    def analyse(self, board, limit):
+        action = FakeEngine.behaviour.pop(0) if FakeEngine.behaviour else 'ok'
+        if action == 'hang':
+            self.closed.wait()
+            raise chess.engine.EngineTerminatedError("killed")
+        if action == 'crash':
+            raise chess.engine.EngineTerminatedError("engine process died")
+        return {"score": chess.engine.PovScore(chess.engine.Cp(20), board.turn)}
+
+    def ping(self):
+        pass
+
+    def close(self):
+        self.closed.set()
+
+    def quit(self):
+        self.closed.set()
+
+
+class StrengthLimitedEngine(FakeEngine):
+    """Engine stand-in declaring Stockfish's UCI_Elo range; out-of-range values are rejected like python-chess does."""
+
+    options = {
+        "UCI_Elo": chess.engine.Option("UCI_Elo", "spin", 1320, 1320, 3190, []),
+        "UCI_LimitStrength": chess.engine.Option("UCI_LimitStrength", "check", False, None, None, []),
+    }
+
+    def configure(self, options):
+        for name, value in options.items():
+            self.options[name].parse(value)
+        super().configure(options)
+
+
+def make_supervisor(factory=FakeEngine, **kwargs):
+    started = []
+
+    def counting_factory():
+        engine = factory()
+        started.append(engine)
+        return engine
+
+    supervisor = EngineSupervisor(counting_factory, options={"Hash": 32}, search_timeout=0.2,
+                                  watchdog_interval=0, **kwargs)
+    return supervisor.start(), started
+
+
+class TestEngineSupervisor:
+    """Test cases for timeouts and restarts."""
+
+    def setup_method(self):
+        FakeEngine.behaviour = []
+
+    def test_hung_search_is_killed_and_engine_replaced(self):
+        supervisor, started = make_supervisor()
+        FakeEngine.behaviour = ['hang']
+
+        with pytest.raises(EngineUnavailableError):
+            supervisor.analyse(chess.Board(), chess.engine.Limit(depth=5))
+
+        assert started[0].closed.is_set()
+        assert len(started) == 2
+        assert started[1].configured == {"Hash": 32}
+        assert supervisor.analyse(chess.Board(), chess.engine.Limit(depth=5))["score"].relative.score() == 20
+        assert supervisor.status()['timeouts'] == 1
+
+    def test_crash_during_search_restarts(self):
+        supervisor, started = make_supervisor()
+        FakeEngine.behaviour = ['crash']
+
+        with pytest.raises(EngineUnavailableError):
+            supervisor.analyse(chess.Board(), chess.engine.Limit(depth=5))
+
+        status = supervisor.status()
+        assert status['state'] == STATE_READY
+        assert status['crashes'] == 1
+        assert len(started) == 2
+
+    def test_engine_that_cannot_start_is_reported_dead(self):
+        def broken_factory():
+            raise FileNotFoundError("stockfish not found")
+
+        supervisor, _ = make_supervisor(broken_factory, restart_backoff=60)
+
+        assert supervisor.status()['state'] == STATE_DEAD
+        with pytest.raises(EngineUnavailableError):
+            supervisor.analyse(chess.Board(), chess.engine.Limit(depth=5))
+
+    def test_strength_below_engine_minimum_is_clamped(self):
+        supervisor = EngineSupervisor(StrengthLimitedEngine, options={"UCI_LimitStrength": True, "UCI_Elo": 1200},
+                                      search_timeout=0.2, watchdog_interval=0).start()
+
+        assert supervisor.status()['state'] == STATE_READY
+        assert supervisor._engine.configured == {"UCI_LimitStrength": True, "UCI_Elo": 1320}
+        supervisor.configure({"UCI_Elo": 4000})
+        assert supervisor._engine.configured["UCI_Elo"] == 3190
+
+    def test_engine_that_cannot_be_configured_is_closed(self):
+        class UnconfigurableEngine(FakeEngine):
+            def configure(self, options):
+                raise chess.engine.EngineError("unsupported option")
+
+        supervisor, started = make_supervisor(UnconfigurableEngine, restart_backoff=0)
+        for _ in range(3):
+            with pytest.raises(EngineUnavailableError):
+                supervisor.analyse(chess.Board(), chess.engine.Limit(depth=5))
+
+        assert len(started) == 4
+        assert all(engine.closed.is_set() for engine in started)
+        assert supervisor.status()['start_failures'] == 4
@@ -0,0 +1,52 @@
+"""
+Tests for the move explanation service.
+"""
+import chess
+import time
+
+from explanations import ExplanationService, TemplateGenerator, STATUS_READY
+
+
+class CountingGenerator(TemplateGenerator):
+    """Template generator that records the size of every batch."""
+
+    batches = []
+
+    def __call__(self, items):
+        CountingGenerator.batches.append(len(items))
+        return super().__call__(items)
+
+
+def wait_ready(service, key):
+    deadline = time.time() + 5
+    while service.get(key)['status'] != STATUS_READY and time.time() < deadline:
+        time.sleep(0.01)
+    return service.get(key)
+
+
+class TestExplanations:
+    """Test cases for batching and caching."""
+
+    def setup_method(self):
+        CountingGenerator.batches = []
+
+    def test_requests_are_batched_and_cached(self):
+        service = ExplanationService(CountingGenerator, batch_size=8, batch_wait=0.2)
+        fen = chess.STARTING_FEN
+        keys = [service.request(fen, san, 'inaccuracy', 'e4', 60) for san in ["a3", "h3", "a4"]]
+        service.start()
+        try:
+            results = [wait_ready(service, key) for key in keys]
+            again = service.request(fen, "a3", 'inaccuracy', 'e4', 60)
+        finally:
+            service.stop()
+
+        assert CountingGenerator.batches == [3]
+        assert results[0]['text'] == "Your move a3: Inaccuracy ⚠️ (CPL: 60) - Best: e4"
+        assert again == keys[0]
+        assert service.stats()['cache_hits'] == 1
+
+    def test_classification_is_part_of_the_key(self):
+        service = ExplanationService(CountingGenerator)
+        fen = chess.STARTING_FEN
+        assert service.request(fen, "a3", 'inaccuracy', 'e4', 60) != service.request(fen, "a3", 'mistake', 'e4', 120)
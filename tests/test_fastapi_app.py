@@ -0,0 +1,50 @@
+"""
+Tests for the API server's game endpoints.
+"""
+import chess
+from fastapi.testclient import TestClient
+
+from variation_tree import PLAYED_BY_ENGINE, PLAYED_BY_USER
+
+
+def play_line(server, *sans):
+    """Play SAN moves alternately as user and engine on the server's tree."""
+    for i, san in enumerate(sans):
+        server.tree.play(server.tree.board().parse_san(san), PLAYED_BY_USER if i % 2 == 0 else PLAYED_BY_ENGINE)
+    server.sync_from_tree()
+
+
+class TestTakebackAndGoto:
+    """Test cases for keeping the player on move in the variation tree."""
+
+    def test_takeback_must_leave_the_player_to_move(self, server):
+        with TestClient(server.app) as client:
+            play_line(server, "e4", "e5", "Nf3", "Nc6")
+            response = client.post("/takeback", json={"plies": 1})
+            assert response.status_code == 400
+            assert server.tree.san_line() == ["e4", "e5", "Nf3", "Nc6"]
+
+            response = client.post("/takeback", json={"plies": 2})
+            assert response.json()['move_history'][-1]['move'] == "e5"
+            assert response.json()['user_to_move']
+
+    def test_goto_a_user_move_replays_the_engine_reply(self, server):
+        with TestClient(server.app) as client:
+            play_line(server, "e4", "e5", "Nf3", "Nc6")
+            user_move = server.tree.current.parent
+            client.post("/takeback", json={"plies": 4})
+
+            response = client.post("/goto", json={"node_id": user_move.id}).json()
+            assert [entry['move'] for entry in response['move_history']] == ["e4", "e5", "Nf3", "Nc6"]
+            assert response['user_to_move']
+            assert response['fen'] == server.tree.board().fen()
+
+    def test_goto_a_finished_game_needs_no_reply(self, server):
+        with TestClient(server.app) as client:
+            play_line(server, "e4", "e5", "Bc4", "Nc6", "Qh5", "Nf6", "Qxf7#")
+            mate = server.tree.current
+            assert client.post("/takeback", json={"plies": 7}).json()['node_id'] == server.tree.root.id
+
+            response = client.post("/goto", json={"node_id": mate.id}).json()
+            assert response['is_game_over'] and response['result'] == "1-0"
+            assert response['node_id'] == mate.id
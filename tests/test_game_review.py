@@ -0,0 +1,111 @@
+"""
+Tests for background game review.
+"""
+import pytest
+import chess
+import chess.engine
+import time
+
+from game_review import (GameReviewQueue, analyze_game, move_accuracy, win_percent,
+                         STATUS_READY, STATUS_FAILED)
+
+
+class FakeEngine:
+    """Engine stand-in: a fixed evaluation per FEN, best move is the first legal move."""
+
+    def __init__(self, scores=None):
+        self.scores = scores or {}
+        self.calls = 0
+
+    def analyse(self, board, limit):
+        self.calls += 1
+        cp = self.scores.get(board.board_fen(), 0)
+        return {
+            "score": chess.engine.PovScore(chess.engine.Cp(cp), board.turn),
+            "pv": [next(iter(board.legal_moves))]
+        }
+
+    def quit(self):
+        pass
+
+
+def stored_moves(sans):
+    board = chess.Board()
+    moves = []
+    for san in sans:
+        moves.append({'move': san, 'fen': board.fen()})
+        board.push_san(san)
+    return moves
+
+
+class TestGameReview:
+    """Test cases for per-ply game review."""
+
+    def test_win_percent_is_symmetric(self):
+        assert win_percent(0) == pytest.approx(50)
+        assert win_percent(300) + win_percent(-300) == pytest.approx(100)
+
+    def test_move_accuracy_bounds(self):
+        assert move_accuracy(60, 60) == pytest.approx(100, abs=0.01)
+        assert move_accuracy(90, 10) < 10
+
+    def test_one_search_per_position(self):
+        engine = FakeEngine()
+        result = analyze_game(stored_moves(["e4", "e5", "Nf3"]), engine, chess.engine.Limit(depth=1))
+
+        assert engine.calls == 4
+        assert [ply['move'] for ply in result['plies']] == ["e4", "e5", "Nf3"]
+        assert all(ply['classification'] == 'book' for ply in result['plies'])
+
+    def test_cpl_from_consecutive_evaluations(self):
+        board = chess.Board()
+        board.push_san("a3")
+        # After 1.a3 Black (to move) is +200, i.e. White lost 200cp
+        engine = FakeEngine({board.board_fen(): 200})
+        result = analyze_game(stored_moves(["a3"]), engine, chess.engine.Limit(depth=1))
+
+        ply = result['plies'][0]
+        assert ply['cpl'] == 200
+        assert ply['classification'] == 'mistake'
+        assert ply['eval'] == -200
+        assert result['summary']['white']['acpl'] == 200
+
+    def test_best_move_is_judged_by_the_evaluation_before_it(self):
+        board = chess.Board()
+        best = board.san(next(iter(board.legal_moves)))  # The fake engine's best move
+        board.push_san(best)
+        # The next search disagrees and scores the best move as losing 200cp
+        engine = FakeEngine({board.board_fen(): 200})
+        ply = analyze_game(stored_moves([best]), engine, chess.engine.Limit(depth=1))['plies'][0]
+
+        assert ply['cpl'] == 0
+        assert ply['accuracy'] == 100.0
+        assert ply['eval'] == -200
+
+    def test_checkmate_is_not_searched(self):
+        engine = FakeEngine()
+        result = analyze_game(stored_moves(["f3", "e5", "g4", "Qh4#"]), engine, chess.engine.Limit(depth=1))
+
+        assert engine.calls == 4
+        assert result['opening']['name'] == "Fool's Mate"
+
+    def test_queue_enriches_stored_game(self):
+        review_queue = GameReviewQueue(FakeEngine, workers=1, max_pending=4)
+        completed = []
+        review_queue.add_listener(lambda game_id, game: completed.append(game_id))
+        review_queue.start()
+        game = {'moves': stored_moves(["e4", "e5"]), 'result': '*'}
+        broken = {'moves': [{'move': 'Ke8', 'fen': chess.STARTING_FEN}]}
+        try:
+            assert review_queue.submit("game-1", game)
+            assert review_queue.submit("game-2", broken)
+            deadline = time.time() + 5
+            while (game['status'] != STATUS_READY or broken['status'] != STATUS_FAILED) and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            review_queue.stop()
+
+        assert game['status'] == STATUS_READY
+        assert len(game['analysis']['plies']) == 2
+        assert broken['status'] == STATUS_FAILED
+        assert completed == ["game-1"]
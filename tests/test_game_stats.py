@@ -0,0 +1,109 @@
+"""
+Tests for aggregate game statistics.
+"""
+import chess
+import chess.engine
+
+from game_review import analyze_game
+from game_stats import GameStatsStore
+
+
+class FakeEngine:
+    """Engine stand-in: a fixed evaluation per FEN (side to move), best move is the first legal move."""
+
+    def __init__(self, scores=None):
+        self.scores = scores or {}
+
+    def analyse(self, board, limit):
+        cp = self.scores.get(board.board_fen(), 0)
+        return {
+            "score": chess.engine.PovScore(chess.engine.Cp(cp), board.turn),
+            "pv": [next(iter(board.legal_moves))]
+        }
+
+
+def reviewed_game(sans, result, scores=None):
+    board = chess.Board()
+    moves = []
+    for san in sans:
+        moves.append({'move': san, 'fen': board.fen()})
+        board.push_san(san)
+    return {
+        'moves': moves,
+        'result': result,
+        'timestamp': '2026-01-01T00:00:00',
+        'analysis': analyze_game(moves, FakeEngine(scores), chess.engine.Limit(depth=1))
+    }
+
+
+def after(sans):
+    board = chess.Board()
+    for san in sans:
+        board.push_san(san)
+    return board.board_fen()
+
+
+# The fake engine scores 2.Qh5 as losing 300 centipawns for White
+BLUNDER = ["e4", "e5", "Qh5", "Nc6"]
+ITALIAN = ["e4", "e5", "Nf3", "Nc6", "Bc4", "Bc5"]
+
+
+def add_games(store):
+    store.add_game("italian", reviewed_game(ITALIAN, "1-0"))
+    store.add_game("blunder", reviewed_game(BLUNDER, "0-1", {after(BLUNDER[:3]): 300, after(BLUNDER): -300}))
+    store.add_game("ongoing", reviewed_game(["d4", "d5"], "*"))
+    store.add_game("empty", reviewed_game([], "*"))
+
+
+class TestGameStats:
+    """Test cases for statistics aggregated over stored games."""
+
+    def test_summary_over_finished_ongoing_and_empty_games(self):
+        store = GameStatsStore()
+        add_games(store)
+        summary = store.summary()
+
+        assert summary['games'] == 4
+        assert summary['results'] == {'1-0': 1, '0-1': 1, '*': 2}
+        # 3 + 2 + 1 white moves; only Qh5 loses centipawns
+        assert summary['players']['white']['acpl'] == round(300 / 6, 1)
+        assert summary['players']['black']['acpl'] == 0.0
+        # The empty game has no accuracy and doesn't pull the average down
+        assert 0 < summary['players']['white']['accuracy'] < summary['players']['black']['accuracy']
+        assert summary['players']['black']['accuracy'] == 100.0
+        assert sum(summary['players']['white']['classifications'].values()) == 6
+        # Most frequent opening first; the empty game has none
+        assert [(opening['eco'], opening['games']) for opening in summary['openings']] == [('A00', 2), ('A40', 1)]
+
+    def test_empty_store(self):
+        summary = GameStatsStore().summary()
+        assert summary['games'] == 0
+        assert summary['players']['white'] == {
+            'accuracy': None, 'acpl': None, 'classifications': summary['players']['white']['classifications']}
+        assert summary['openings'] == []
+
+    def test_last_n_games_matches_running_totals(self):
+        store = GameStatsStore()
+        add_games(store)
+        store.flush()
+        assert store.summary(last=4) == store.summary()
+        assert store.summary(last=2)['results'] == {'*': 2}
+
+    def test_persisted_totals_are_rebuilt_on_load(self, tmp_path):
+        store = GameStatsStore(str(tmp_path), flush_every=3)
+        add_games(store)  # One part file written automatically, one game still buffered
+        store.flush()
+
+        loaded = GameStatsStore(str(tmp_path))
+        loaded.load()
+        assert loaded.summary() == store.summary()
+        assert [row['game_id'] for row in loaded.recent_games(2)] == ["empty", "ongoing"]
+
+    def test_recent_games_include_average_cpl(self):
+        store = GameStatsStore()
+        add_games(store)
+        rows = {row['game_id']: row for row in store.recent_games()}
+        assert rows['blunder']['white_acpl'] == 150.0  # Qh5 lost 300cp over 2 white moves
+        assert rows['blunder']['white_cpl_sum'] == 300
+        assert rows['blunder']['black_acpl'] == 0.0
+        assert rows['empty']['white_acpl'] is None
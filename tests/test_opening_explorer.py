@@ -0,0 +1,66 @@
+"""
+Tests for the opening explorer.
+"""
+import chess
+
+from opening_explorer import OpeningExplorer
+
+
+def make_game(sans, result, cpls=None):
+    board = chess.Board()
+    moves = []
+    for san in sans:
+        moves.append({"move": san, "fen": board.fen()})
+        board.push_san(san)
+    game = {"moves": moves, "result": result}
+    if cpls is not None:
+        game["analysis"] = {"plies": [{"cpl": cpl} for cpl in cpls]}
+    return game
+
+
+def by_move(result):
+    return {m["move"]: m for m in result["moves"]}
+
+
+def test_book_moves_are_listed_before_any_game():
+    explorer = OpeningExplorer()
+    moves = by_move(explorer.lookup(chess.STARTING_FEN))
+    assert moves["e4"]["book"] and moves["e4"]["games"] == 0
+    assert moves["e4"]["opening"]["name"] == "King's Pawn Opening"
+    assert moves["e4"]["score"] is None
+
+
+def test_games_update_counts_score_and_cpl():
+    explorer = OpeningExplorer()
+    explorer.add_game("g1", make_game(["e4", "c5"], "1-0", cpls=[0, 10]))
+    explorer.add_game("g2", make_game(["e4", "e5"], "1/2-1/2", cpls=[0, 30]))
+    explorer.add_game("g3", make_game(["a3"], "0-1"))
+
+    root = explorer.lookup(chess.STARTING_FEN)
+    assert root["games"] == 3
+    assert root["moves"][0]["move"] == "e4"
+    e4 = by_move(root)["e4"]
+    assert (e4["games"], e4["white"], e4["draws"], e4["score"], e4["avg_cpl"]) == (2, 1, 1, 75.0, 0.0)
+    a3 = by_move(root)["a3"]
+    assert not a3["book"] and a3["score"] == 0.0 and a3["avg_cpl"] is None
+
+    board = chess.Board()
+    board.push_san("e4")
+    replies = by_move(explorer.lookup(board.fen()))
+    assert replies["c5"]["score"] == 0.0  # Scored for Black, the side to move
+    assert replies["e5"]["avg_cpl"] == 30.0
+
+
+def test_max_ply_and_persistence(tmp_path):
+    path = str(tmp_path / "explorer.parquet")
+    explorer = OpeningExplorer(path, max_ply=1)
+    explorer.add_game("g1", make_game(["d4", "d5"], "1-0"))
+    explorer.flush()
+
+    reloaded = OpeningExplorer(path)
+    reloaded.load()
+    assert by_move(reloaded.lookup(chess.STARTING_FEN))["d4"]["games"] == 1
+    board = chess.Board()
+    board.push_san("d4")
+    assert by_move(reloaded.lookup(board.fen()))["d5"]["games"] == 0
+    assert reloaded.stats()["positions"] == 1
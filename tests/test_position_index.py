@@ -0,0 +1,64 @@
+"""
+Tests for the position search index.
+"""
+import chess
+import numpy as np
+
+from position_index import PositionIndex, material_signature
+
+
+def stored_moves(sans, fen=chess.STARTING_FEN):
+    board = chess.Board(fen)
+    moves = []
+    for san in sans:
+        moves.append({'move': san, 'fen': board.fen()})
+        board.push_san(san)
+    return moves
+
+
+RUY_LOPEZ = ["e4", "e5", "Nf3", "Nc6", "Bb5", "a6", "Ba4", "Nf6"]
+ITALIAN = ["e4", "e5", "Nf3", "Nc6", "Bc4", "Bc5", "c3", "Nf6"]
+
+
+class TestPositionIndex:
+    """Test cases for position postings."""
+
+    def test_material_signature(self):
+        assert material_signature(chess.Board("8/8/4k3/8/2r5/8/3KRP2/8 w - - 0 1")) == "KRPvKR"
+
+    def test_shared_position_found_in_both_games(self):
+        index = PositionIndex()
+        index.add_game("ruy", stored_moves(RUY_LOPEZ))
+        index.add_game("italian", stored_moves(ITALIAN))
+
+        board = chess.Board()
+        for san in ["e4", "e5", "Nf3", "Nc6"]:
+            board.push_san(san)
+        total, postings = index.search_fen(board.fen())
+
+        assert total == 2
+        assert {(p['game_id'], p['ply']) for p in postings} == {("ruy", 4), ("italian", 4)}
+
+    def test_eco_and_material(self):
+        index = PositionIndex()
+        index.add_game("ruy", stored_moves(RUY_LOPEZ))
+        index.add_game("endgame", stored_moves(["Kd3"], "8/8/4k3/8/2r5/8/3KRP2/8 w - - 0 1"))
+
+        assert index.search_eco("c60")[1] == [{'game_id': "ruy", 'ply': 7}]
+        assert index.search_material("KRPvKR")[1] == [{'game_id': "endgame", 'ply': 0}]
+        assert index.search_material(" krpvkr")[1] == [{'game_id': "endgame", 'ply': 0}]
+        assert index.search_material("KPRvKR")[1] == [{'game_id': "endgame", 'ply': 0}]
+
+    def test_compacted_segments_reload_from_disk(self, tmp_path):
+        index = PositionIndex(str(tmp_path), compact_every=1)
+        index.add_game("ruy", stored_moves(RUY_LOPEZ))
+        index.add_game("italian", stored_moves(ITALIAN))
+        assert index.stats()['delta_postings'] == 0
+
+        reloaded = PositionIndex(str(tmp_path))
+        reloaded.load()
+        total, postings = reloaded.search_fen(chess.STARTING_FEN)
+
+        assert total == 2
+        assert isinstance(reloaded._segments["zobrist"], np.memmap)
+        assert reloaded.stats()['games'] == 2
@@ -0,0 +1,68 @@
+"""
+Tests for on-demand request profiling.
+"""
+import threading
+
+from profiling import Profiler, TracedEngine, profiled, span
+
+
+class EchoEngine:
+    def analyse(self, board, limit, **kwargs):
+        return {"limit": limit, **kwargs}
+
+    def status(self):
+        return {"state": "ready"}
+
+
+@profiled
+def inner():
+    with span("work"):
+        return sum(range(1000))
+
+@profiled
+def handler(engine):
+    inner()
+    return engine.analyse(None, "depth 5", priority=1)
+
+
+def test_only_admins_can_request_a_profile():
+    profiler = Profiler(admin_token="token")
+    assert profiler.should_profile(True, "token") == "requested"
+    assert profiler.should_profile(True, "wrong") is None
+    assert profiler.should_profile(False, "token") is None
+    assert Profiler().should_profile(True, None) is None
+    assert Profiler(sample_rate=1.0).should_profile(False, None) == "sampled"
+
+
+def test_profiled_request_records_spans_and_functions():
+    profiler = Profiler(admin_token="token", max_reports=1)
+    engine = TracedEngine(EchoEngine(), "reviewer")
+    assert engine.status() == {"state": "ready"}
+    with profiler.request("POST", "/move", "requested") as profile:
+        assert handler(engine) == {"limit": "depth 5", "priority": 1}
+    report = profiler.get(profile.id)
+    names = [s["name"] for s in report["spans"]]
+    assert names == ["work", "inner", "engine.analyse", "handler"]
+    assert [s["handler"] for s in report["spans"] if "handler" in s] == [False, True]
+    assert report["cprofile"] == "ok"
+    assert any("inner" in f["function"] for f in report["functions"])
+
+    with profiler.request("GET", "/state", "sampled"):
+        pass
+    assert [r["path"] for r in profiler.reports()] == ["/state"]
+
+
+def test_unprofiled_calls_record_nothing():
+    profiler = Profiler(admin_token="token")
+    assert handler(TracedEngine(EchoEngine(), "reviewer"))["priority"] == 1
+    assert profiler.reports() == []
+
+
+def test_profile_does_not_leak_into_other_threads():
+    profiler = Profiler()
+    seen = []
+    with profiler.request("GET", "/", "sampled") as profile:
+        thread = threading.Thread(target=lambda: seen.append(inner()))
+        thread.start()
+        thread.join()
+    assert seen and profiler.get(profile.id)["spans"] == []
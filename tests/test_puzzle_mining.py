@@ -0,0 +1,80 @@
+"""
+Tests for the puzzle mining pipeline.
+"""
+import gzip
+import json
+import chess
+import chess.engine
+
+import puzzle_mining
+from puzzle_mining import PuzzleMiner, iter_stored_games, mine_game
+
+
+class TwoLineEngine:
+    """Engine stand-in: the first two legal moves in UCI order, scored best and second for the side to move."""
+
+    def __init__(self, best, second):
+        self.best = best
+        self.second = second
+        self.calls = 0
+
+    def analyse(self, board, limit, multipv=1):
+        self.calls += 1
+        moves = sorted(board.legal_moves, key=lambda m: m.uci())[:multipv]
+        return [{"score": chess.engine.PovScore(chess.engine.Cp(cp), board.turn), "pv": [move]}
+                for cp, move in zip((self.best, self.second), moves)]
+
+
+def blunder_plies():
+    board = chess.Board()
+    plies = []
+    for i, san in enumerate(["e4", "e5", "Qh5"]):
+        plies.append({"ply": i + 1, "move": san, "fen": board.fen(), "cpl": 300 if i == 2 else 0,
+                      "classification": "blunder" if i == 2 else "best"})
+        board.push_san(san)
+    return plies
+
+
+def test_mine_game_keeps_only_unique_solutions(monkeypatch):
+    monkeypatch.setattr(puzzle_mining, "worker_engine", lambda options: TwoLineEngine(400, 0))
+    result = mine_game([], blunder_plies(), review_depth=5, verify_depth=10,
+                       min_margin=200, min_advantage=150, solution_plies=3)
+    assert result["candidates"] == 1 and result["verified"] == 1
+    [puzzle] = result["puzzles"]
+    board = chess.Board(blunder_plies()[2]["fen"])
+    board.push_san("Qh5")
+    assert puzzle["fen"] == board.fen()
+    assert puzzle["solution"] == [min(board.legal_moves, key=lambda m: m.uci()).uci()]
+    assert puzzle["margin"] == 400 and puzzle["classification"] == "blunder"
+
+    monkeypatch.setattr(puzzle_mining, "worker_engine", lambda options: TwoLineEngine(400, 300))
+    result = mine_game([], blunder_plies(), review_depth=5, verify_depth=10,
+                       min_margin=200, min_advantage=150, solution_plies=3)
+    assert result["verified"] == 1 and result["puzzles"] == []
+
+
+def test_iter_stored_games_reuses_ready_reviews(tmp_path):
+    path = str(tmp_path / "stored_games.json.gz")
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump([["a", {"status": "ready", "moves": [], "analysis": {"plies": blunder_plies()}}],
+                   ["b", {"status": "queued", "moves": []}]], f)
+    games = list(iter_stored_games(path))
+    assert [game[0] for game in games] == ["a", "b"]
+    assert games[0][3] == blunder_plies() and games[1][3] is None
+
+
+def test_miner_deduplicates_and_resumes(tmp_path):
+    output = str(tmp_path / "puzzles.jsonl")
+    puzzle = {"id": "00ff", "fen": chess.STARTING_FEN, "solution": ["e2e4"]}
+    miner = PuzzleMiner(output, checkpoint_every=1)
+    with open(output, "a", encoding="utf-8") as out:
+        miner._record("game-1", {"puzzles": [puzzle], "candidates": 1, "verified": 1}, out)
+        miner._record("game-2", {"puzzles": [puzzle], "candidates": 1, "verified": 1}, out)
+    assert miner.counters["puzzles"] == 1 and miner.counters["duplicates"] == 1
+
+    resumed = PuzzleMiner(output)
+    resumed.load()
+    assert resumed.seen == {"00ff"}
+    assert resumed.done == {"game-1", "game-2"}
+    with open(output, encoding="utf-8") as f:
+        assert [json.loads(line)["game"] for line in f] == ["game-1"]
@@ -0,0 +1,75 @@
+"""
+Tests for the self-play game generator.
+"""
+import pytest
+import io
+import chess
+import chess.engine
+import chess.pgn
+from fastapi.testclient import TestClient
+
+import self_play
+from self_play import analysis_sinks, game_to_pgn, pgn_eval, play_game, strength_options
+
+
+class FirstMoveEngine:
+    """Engine stand-in: always plays the first legal move in UCI order, evaluates every position as 0."""
+
+    def play(self, board, limit):
+        return chess.engine.PlayResult(min(board.legal_moves, key=lambda m: m.uci()), None)
+
+    def analyse(self, board, limit):
+        return {"score": chess.engine.PovScore(chess.engine.Cp(0), board.turn), "pv": [self.play(board, limit).move]}
+
+
+@pytest.fixture
+def first_move_engine(monkeypatch):
+    engine = FirstMoveEngine()
+    monkeypatch.setattr(self_play, "worker_engine", lambda options: engine)
+    return engine
+
+
+class TestSelfPlay:
+    """Test cases for playing, exporting and storing self-play games."""
+
+    def test_strength_options(self):
+        assert strength_options(None) == {}
+        assert strength_options(1500) == {"UCI_LimitStrength": True, "UCI_Elo": 1500}
+
+    def test_play_game_reviews_every_ply(self, first_move_engine):
+        game = play_game(1200, None, move_time=0.01, review_depth=5, max_plies=12, opening_plies=2, seed=1)
+        assert len(game["moves"]) == 12
+        assert len(game["analysis"]["plies"]) == 12
+        assert game["result"] == "*"
+        assert game["analysis"]["plies"][0]["classification"] == "book"
+
+    def test_game_to_pgn_round_trip(self, first_move_engine):
+        game = play_game(None, 1800, move_time=0.01, review_depth=5, max_plies=8, opening_plies=0)
+        pgn = str(game_to_pgn("game-1", game))
+        parsed = chess.pgn.read_game(io.StringIO(pgn))
+        assert parsed.headers["GameId"] == "game-1"
+        assert parsed.headers["Black"] == "Stockfish 1800"
+        assert [m.uci() for m in parsed.mainline_moves()] == [
+            chess.Board(m["fen"]).parse_san(m["move"]).uci() for m in game["moves"]]
+        assert "[%eval 0.00]" in parsed.next().comment
+
+    def test_mate_scores_use_mate_notation(self):
+        assert pgn_eval(-35) == "-0.35"
+        assert pgn_eval(9997) == "#3"
+        assert pgn_eval(-9999) == "#-1"
+        assert pgn_eval(10000) is None  # The game is over
+
+    def test_postings_survive_server_startup(self, tmp_path, first_move_engine, server):
+        sinks, stores = analysis_sinks(str(tmp_path / "analysis"))
+        for i in range(3):
+            game = play_game(None, None, move_time=0.01, review_depth=1, max_plies=6, opening_plies=0)
+            for sink in sinks:
+                sink(f"self-play-{i}", game)
+        for store in stores:
+            store()
+
+        with TestClient(server.app) as client:
+            result = client.get("/positions/search", params={"fen": chess.STARTING_FEN}).json()
+        assert result["total"] == 3
+        assert {posting["game_id"] for posting in result["postings"]} == {"self-play-0", "self-play-1", "self-play-2"}
+        assert not any(posting["stored"] for posting in result["postings"])
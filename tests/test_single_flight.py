@@ -0,0 +1,91 @@
+"""
+Tests for single-flight engine request coalescing.
+"""
+import chess
+import chess.engine
+import threading
+import time
+
+from single_flight import CoalescingEngine, position_key
+
+
+class SlowEngine:
+    """Engine stand-in whose searches take a while and are counted."""
+
+    def __init__(self):
+        self.calls = []
+
+    def analyse(self, board, limit, **kwargs):
+        self.calls.append(limit.depth)
+        time.sleep(0.1)
+        return {"depth": limit.depth}
+
+    def status(self):
+        return {"state": "ready"}
+
+
+def run_concurrently(engine, requests):
+    results = [None] * len(requests)
+
+    def worker(i, board, limit):
+        results[i] = engine.analyse(board, limit)
+
+    threads = [threading.Thread(target=worker, args=(i, board, limit)) for i, (board, limit) in enumerate(requests)]
+    for i, thread in enumerate(threads):
+        thread.start()
+        if i == 0:
+            time.sleep(0.02)  # Let the first request become the leader
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestSingleFlight:
+    """Test cases for request coalescing."""
+
+    def test_identical_requests_share_one_search(self):
+        slow = SlowEngine()
+        engine = CoalescingEngine(slow)
+        results = run_concurrently(engine, [(chess.Board(), chess.engine.Limit(depth=5))] * 5)
+
+        assert slow.calls == [5]
+        assert all(result == {"depth": 5} for result in results)
+        assert engine.coalescing_stats()['coalesced'] == 4
+
+    def test_deeper_search_satisfies_shallower_request(self):
+        slow = SlowEngine()
+        engine = CoalescingEngine(slow)
+        results = run_concurrently(engine, [(chess.Board(), chess.engine.Limit(depth=12)),
+                                            (chess.Board(), chess.engine.Limit(depth=5))])
+
+        assert slow.calls == [12]
+        assert results[1] == {"depth": 12}
+
+    def test_shallower_or_different_positions_search_separately(self):
+        slow = SlowEngine()
+        engine = CoalescingEngine(slow)
+        other = chess.Board()
+        other.push_san("e4")
+        run_concurrently(engine, [(chess.Board(), chess.engine.Limit(depth=5)),
+                                  (chess.Board(), chess.engine.Limit(depth=12)),
+                                  (other, chess.engine.Limit(depth=5))])
+
+        assert sorted(slow.calls) == [5, 5, 12]
+
+    def test_same_position_with_other_draw_state_searches_separately(self):
+        slow = SlowEngine()
+        engine = CoalescingEngine(slow)
+        fresh = chess.Board()
+        fresh.push_san("Nf3")
+        repeated = chess.Board()
+        for san in ("Nf3", "Nf6", "Ng1", "Ng8", "Nf3"):
+            repeated.push_san(san)
+        assert position_key(fresh)[0] == position_key(repeated)[0]
+        run_concurrently(engine, [(fresh, chess.engine.Limit(depth=5)), (repeated, chess.engine.Limit(depth=5))])
+
+        assert slow.calls == [5, 5]
+        assert position_key(chess.Board(fresh.fen())) != position_key(fresh)  # No history, clock kept
+        assert position_key(chess.Board(fresh.fen()))[1] == 1
+
+    def test_other_attributes_are_delegated(self):
+        assert CoalescingEngine(SlowEngine()).status() == {"state": "ready"}
@@ -0,0 +1,71 @@
+"""
+Tests for serving the prebuilt frontend.
+"""
+import pytest
+import os
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from static_build import IMMUTABLE_CACHE, REVALIDATE_CACHE, StaticBuild, precompress_build
+
+APP_SHELL = b"<html><body>app shell</body></html>"
+BUNDLE = b"console.log('chess');\n" * 100
+
+
+@pytest.fixture
+def client(tmp_path):
+    build_dir = tmp_path / "build"
+    (build_dir / "static" / "js").mkdir(parents=True)
+    (build_dir / "index.html").write_bytes(APP_SHELL)
+    (build_dir / "static" / "js" / "main.3f2a9c1e.chunk.js").write_bytes(BUNDLE)
+    (build_dir / "manifest.json").write_bytes(b"{}")
+    (tmp_path / "secret.txt").write_bytes(b"outside the build")
+    precompress_build(str(build_dir))
+
+    build = StaticBuild(str(build_dir))
+    build.load()
+    app = FastAPI()
+
+    @app.get("/{path:path}")
+    def frontend(request: Request, path: str):
+        return build.response(request, path)
+
+    return TestClient(app)
+
+
+class TestStaticBuild:
+    """Test cases for cache headers, compression and routing."""
+
+    def test_hashed_assets_are_immutable(self, client):
+        response = client.get("/static/js/main.3f2a9c1e.chunk.js", headers={"Accept-Encoding": "identity"})
+        assert response.content == BUNDLE
+        assert response.headers["cache-control"] == IMMUTABLE_CACHE
+        assert client.get("/manifest.json").headers["cache-control"] == REVALIDATE_CACHE
+        assert client.get("/").headers["cache-control"] == REVALIDATE_CACHE
+
+    def test_precompressed_sibling_is_served(self, client, tmp_path):
+        assert os.path.exists(tmp_path / "build" / "static" / "js" / "main.3f2a9c1e.chunk.js.gz")
+        response = client.get("/static/js/main.3f2a9c1e.chunk.js", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.content == BUNDLE  # Decoded by the client
+        assert response.headers["vary"] == "Accept-Encoding"
+
+    def test_client_routes_fall_back_to_the_app_shell(self, client):
+        response = client.get("/review?id=abc")
+        assert response.status_code == 200
+        assert response.content == APP_SHELL
+        assert client.get("/static/js/missing.js").status_code == 404
+
+    def test_paths_outside_the_build_are_not_served(self, client):
+        for path in ("/../secret.txt", "/static/../../secret.txt", "/%2e%2e/secret.txt", "/..%2Fsecret.txt"):
+            response = client.get(path)
+            assert b"outside the build" not in response.content
+            assert response.status_code in (200, 404)
+
+    def test_load_does_not_compress(self, tmp_path):
+        build_dir = tmp_path / "build"
+        build_dir.mkdir()
+        (build_dir / "index.html").write_bytes(APP_SHELL * 100)
+        StaticBuild(str(build_dir)).load()
+        assert os.listdir(build_dir) == ["index.html"]
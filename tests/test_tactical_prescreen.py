@@ -0,0 +1,53 @@
+"""
+Tests for the engine-free tactical pre-screen.
+"""
+import chess
+
+from tactical_prescreen import prescreen_move, static_exchange_evaluation
+
+
+def board_after(sans, fen=chess.STARTING_FEN):
+    board = chess.Board(fen)
+    for san in sans:
+        board.push_san(san)
+    return board
+
+
+class TestTacticalPrescreen:
+    """Test cases for static move classification."""
+
+    def test_see_defended_pawn_capture_loses_the_knight(self):
+        board = chess.Board("4k3/8/3p4/4p3/8/5N2/8/4K3 w - - 0 1")
+        assert static_exchange_evaluation(board, board.parse_san("Nxe5")) == 100 - 320
+
+    def test_see_undefended_capture_wins_the_piece(self):
+        board = chess.Board("4k3/8/8/4r3/8/8/8/4R1K1 w - - 0 1")
+        assert static_exchange_evaluation(board, board.parse_san("Rxe5")) == 500
+
+    def test_only_legal_move(self):
+        board = chess.Board("7k/8/8/8/8/8/6q1/7K w - - 0 1")
+        result = prescreen_move(board, board.parse_san("Kxg2"))
+        assert result['reason'] == 'only_move'
+        assert result['cpl'] == 0
+
+    def test_forced_recapture(self):
+        board = board_after(["e4", "e5", "Nf3", "Nc6", "Bb5", "a6", "Bxc6"])
+        result = prescreen_move(board, board.parse_san("dxc6"))
+        assert result['reason'] == 'forced_recapture'
+        assert result['classification'] == 'best'
+
+    def test_recapture_with_mate_available_goes_to_the_engine(self):
+        # Qxf7# beats recapturing the bishop
+        board = board_after(["e4", "e5", "Bc4", "Bc5", "Qh5", "Bb4", "Nc3", "Bxc3"])
+        assert prescreen_move(board, board.parse_san("dxc3")) is None
+
+    def test_hanging_queen_is_a_blunder(self):
+        board = board_after(["e4", "d6"])
+        result = prescreen_move(board, board.parse_san("Qg4"))
+        assert result['reason'] == 'hanging_piece'
+        assert result['classification'] == 'blunder'
+        assert result['best_move'] is None
+
+    def test_ordinary_move_goes_to_the_engine(self):
+        board = board_after(["e4", "e5"])
+        assert prescreen_move(board, board.parse_san("Nf3")) is None
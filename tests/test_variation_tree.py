@@ -0,0 +1,106 @@
+"""
+Tests for the live game's variation tree.
+"""
+import pytest
+import chess
+
+from variation_tree import VariationTree, PLAYED_BY_ENGINE, PLAYED_BY_USER
+
+
+def play_line(tree, *sans):
+    """Play SAN moves alternately as user and engine."""
+    for i, san in enumerate(sans):
+        move = tree.board().parse_san(san)
+        tree.play(move, PLAYED_BY_USER if i % 2 == 0 else PLAYED_BY_ENGINE)
+
+
+class TestVariationTree:
+    """Test cases for lines, branches, takebacks and serialization."""
+
+    def test_history_matches_line(self):
+        tree = VariationTree()
+        play_line(tree, "e4", "e5", "Nf3")
+        assert tree.san_line() == ["e4", "e5", "Nf3"]
+        history = tree.history()
+        assert history[0] == {"move": "e4", "fen": chess.STARTING_FEN}
+        assert tree.board().fen() == chess.Board("rnbqkbnr/pppp1ppp/8/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 1 2").fen()
+
+
+    def test_takeback_defaults_to_before_last_user_move(self):
+        tree = VariationTree()
+        play_line(tree, "e4", "e5", "Nf3", "Nc6")
+        tree.takeback()
+        assert tree.san_line() == ["e4", "e5"]
+        tree.takeback(1)
+        assert tree.san_line() == ["e4"]
+        tree.takeback(10)
+        assert tree.current is tree.root
+
+
+    def test_replaying_a_move_reuses_its_node_and_analysis(self):
+        tree = VariationTree()
+        node = tree.play(chess.Move.from_uci("e2e4"))
+        node.analysis = {"cpl": 0}
+        tree.takeback()
+        assert tree.child(chess.Move.from_uci("e2e4")).analysis == {"cpl": 0}
+        assert tree.play(chess.Move.from_uci("e2e4")) is node
+        assert len(tree.nodes) == 2
+
+
+    def test_branches_and_goto(self):
+        tree = VariationTree()
+        play_line(tree, "e4", "e5")
+        main_reply = tree.current
+        tree.takeback()
+        play_line(tree, "d4", "d5")
+        assert len(tree.root.children) == 2
+        assert tree.goto(main_reply.id).san == "e5"
+        assert tree.san_line() == ["e4", "e5"]
+        tree.takeback(1)
+        assert tree.reply() is main_reply
+        with pytest.raises(KeyError):
+            tree.goto(12345)
+
+
+    def test_fen_root_and_illegal_move(self):
+        fen = "8/8/8/4k3/8/8/4P3/4K3 w - - 0 1"
+        tree = VariationTree(fen)
+        assert tree.history() == []
+        assert tree.board().fen() == fen
+        with pytest.raises(ValueError):
+            tree.play(chess.Move.from_uci("e2e5"))
+
+
+    def test_round_trip_keeps_ids_analysis_and_current_node(self):
+        tree = VariationTree()
+        play_line(tree, "e4", "e5")
+        tree.takeback()
+        play_line(tree, "d4")
+        tree.current.analysis = {"cpl": 12}
+        tree.root.evaluation = {"evaluation": 20, "best_move": "e4"}
+
+        restored = VariationTree.from_dict(tree.to_dict())
+        assert restored.to_dict() == tree.to_dict()
+        assert restored.san_line() == ["d4"]
+        assert restored.current.analysis == {"cpl": 12}
+        assert restored.play(chess.Move.from_uci("d7d5"), PLAYED_BY_ENGINE).id == max(tree.nodes) + 1
+
+    def test_user_to_move_after_takeback_and_goto(self):
+        tree = VariationTree()
+        assert tree.user_to_move()
+        play_line(tree, "e4", "e5")
+        assert tree.user_to_move()
+        tree.takeback(1)
+        assert not tree.user_to_move()
+        tree.goto(tree.root.id)
+        assert tree.user_to_move()
+
+    def test_goto_undoes_an_unanswered_user_move(self):
+        tree = VariationTree()
+        play_line(tree, "e4", "e5")
+        start = tree.current
+        tree.play(chess.Move.from_uci("g1f3")).analysis = {"cpl": 0}
+        tree.goto(start.id)  # As /move does when the engine reply fails
+        assert tree.san_line() == ["e4", "e5"]
+        assert tree.user_to_move()
+        assert tree.child(chess.Move.from_uci("g1f3")).analysis == {"cpl": 0}
@@ -0,0 +1,42 @@
+"""
+Tests for warm restart snapshots.
+"""
+import os
+
+from warm_restart import WarmRestart
+
+
+def test_sections_restore_lazily_once(tmp_path):
+    state = {"games": ["a", "b"]}
+    first = WarmRestart(str(tmp_path))
+    first.register("games", lambda: state["games"], lambda data: None)
+    first.save()
+
+    restored = []
+    second = WarmRestart(str(tmp_path))
+    second.register("games", lambda: restored, restored.extend)
+    assert restored == []  # Nothing is read at startup
+    assert second.status()["games"]["pending"]
+
+    restore = second.dependency("games")
+    restore()
+    restore()
+    assert restored == ["a", "b"]
+    assert not os.path.exists(tmp_path / "games.json.gz")
+
+
+def test_unrestored_section_keeps_its_snapshot(tmp_path):
+    first = WarmRestart(str(tmp_path))
+    first.register("session", lambda: {"fen": "x"}, lambda data: None)
+    first.save()
+
+    # Restarted, but nothing touched the session before the next shutdown
+    second = WarmRestart(str(tmp_path))
+    second.register("session", lambda: {"fen": "empty"}, lambda data: None)
+    second.save()
+
+    restored = []
+    third = WarmRestart(str(tmp_path))
+    third.register("session", lambda: None, restored.append)
+    third.ensure("session")
+    assert restored == [{"fen": "x"}]